@@ -1,9 +1,16 @@
 ﻿"""
 Flask Web Application for Market Intelligence Swarm
 """
-from flask import Flask, jsonify, render_template
+import asyncio
+import json
+import os
+import re
+import time
+from flask import Flask, Response, jsonify, render_template, request
 from flask_cors import CORS
 from swarm_orchestrator import SwarmOrchestrator
+from metrics import registry
+from snapshot import encode_json
 import config
 
 app = Flask(__name__)
@@ -17,18 +24,177 @@ def index():
     """Main dashboard page"""
     return render_template('index.html')
 
+MAX_PAGE_SIZE = 1000
+
+def _snapshot_response(snapshot):
+    """Serve a pre-serialized snapshot, or a slice of it, with ETag revalidation
+    
+    Query params: fields=a,b (only those top-level fields) or
+    field=<name>&offset=0&limit=100 (one page of a list or map field).
+    """
+    encoding = None
+    if 'field' in request.args:
+        field = request.args['field']
+        try:
+            offset = max(int(request.args.get('offset', 0)), 0)
+            limit = min(max(int(request.args.get('limit', 100)), 1), MAX_PAGE_SIZE)
+            body = encode_json(snapshot.page(field, offset, limit))
+        except KeyError:
+            return jsonify({'error': f"Unknown field {field}"}), 404
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        etag = snapshot.variant_etag(f"page:{field}:{offset}:{limit}")
+        current = [etag]
+    elif 'fields' in request.args:
+        fields = sorted(set(filter(None, request.args['fields'].split(','))))
+        body = snapshot.select(fields)
+        etag = snapshot.variant_etag(f"fields:{','.join(fields)}")
+        current = [etag]
+    else:
+        body, encoding = snapshot.encoded(request.headers.get('Accept-Encoding', ''))
+        etag = snapshot.encoding_etag(encoding)
+        # A tag for any coding of the current body means the client is up to date
+        current = [snapshot.encoding_etag(coding) for coding in (None, 'gzip', 'br')]
+    
+    if any(request.if_none_match.contains_weak(tag.strip('"')) for tag in current):
+        response = Response(status=304)
+    else:
+        response = Response(body, content_type='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.headers['ETag'] = etag
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    age = swarm.snapshot_age()
+    if age is not None:
+        response.headers['X-Snapshot-Age'] = f"{age:.1f}"
+    return response
+
+def _warming_up():
+    """503 while the first crawl after a cold start is still running"""
+    response = jsonify({'status': 'warming_up', 'message': 'First intelligence gathering in progress'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '5'
+    return response
+
 @app.route('/api/intelligence')
 def get_intelligence():
     """Get market intelligence"""
     force_refresh = False  # Can be made configurable via query param
-    intelligence = swarm.get_intelligence(force_refresh=force_refresh)
-    return jsonify(intelligence)
+    if swarm.is_warming_up():
+        return _warming_up()
+    return _snapshot_response(swarm.get_serialized(force_refresh=force_refresh))
+
+@app.route('/api/intelligence/stream')
+def stream_intelligence():
+    """Server-Sent Events: what changed after each refresh
+    
+    Events: `hello` (current seq and ETag), `delta` (id: seq; new top
+    stories, per-ticker sentiment and index changes; apply in order) and
+    `reset` (the client's copy is out of date: re-fetch /api/intelligence).
+    Reconnecting clients send Last-Event-ID to receive the deltas they missed.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': f"Invalid Last-Event-ID {last_event_id!r}"}), 400
+    subscription = swarm.deltas.subscribe(last_event_id)
+    if subscription is None:
+        response = jsonify({'error': 'Too many stream clients'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+    return Response(subscription.events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/api/intelligence/refresh')
 def refresh_intelligence():
     """Force refresh intelligence"""
-    intelligence = swarm.get_intelligence(force_refresh=True)
-    return jsonify(intelligence)
+    return _snapshot_response(swarm.get_serialized(force_refresh=True))
+
+_WINDOW_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+def _parse_window(value):
+    """'24h', '90m', '7d' or plain seconds"""
+    match = re.fullmatch(r'(\d+)([smhd]?)', value.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid window {value!r}; use e.g. 90m, 24h or 7d")
+    return int(match.group(1)) * _WINDOW_UNITS[match.group(2) or 's']
+
+@app.route('/api/sentiment/<ticker>/series')
+def sentiment_series(ticker):
+    """Bucketed sentiment for a ticker ('market' for all documents)
+    
+    Query params: resolution (1m, 5m, 1h; default 5m) and window (e.g. 24h;
+    default everything the resolution keeps).
+    """
+    symbol = ticker.upper()
+    symbol = None if symbol == 'MARKET' else symbol
+    if symbol and symbol not in swarm.sentiment_series and symbol not in swarm.intelligence_engine.universe:
+        return jsonify({'error': f"Unknown ticker {ticker}"}), 404
+    try:
+        window = request.args.get('window')
+        since_ts = None
+        if window:
+            since_ts = time.time() - _parse_window(window)
+        series = swarm.sentiment_series.window(symbol, request.args.get('resolution', '5m'), since_ts)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    series['ticker'] = symbol or 'MARKET'
+    return jsonify(series)
+
+@app.route('/api/documents/<kind>')
+def recent_documents(kind):
+    """Newest documents of one kind ('rss' or 'reddit') in a time window, with its sentiment
+    
+    Query params: window (e.g. 6h; default 24h) or since/until (epoch
+    seconds), and limit (default 50).
+    """
+    if kind not in swarm.aggregator.documents:
+        return jsonify({'error': f"Unknown document kind {kind}"}), 404
+    try:
+        until_ts = float(request.args['until']) if 'until' in request.args else None
+        if 'since' in request.args:
+            since_ts = float(request.args['since'])
+        else:
+            since_ts = (until_ts or time.time()) - _parse_window(request.args.get('window', '24h'))
+        limit = min(max(int(request.args.get('limit', 50)), 1), MAX_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(swarm.aggregator.recent(kind, since_ts, until_ts, limit))
+
+@app.route('/api/research/<competitor>/stream')
+def stream_research(competitor):
+    """Server-Sent Events: agent progress and analysis tokens for one competitor"""
+    # The LangGraph swarm (LLM client, search tool) is only loaded when first used
+    import main as research_swarm
+
+    def generate():
+        loop = asyncio.new_event_loop()
+        events = research_swarm.stream_research(competitor)
+        try:
+            while True:
+                try:
+                    event = loop.run_until_complete(events.__anext__())
+                except StopAsyncIteration:
+                    break
+                except Exception as e:
+                    event = {'event': 'error', 'message': str(e)}
+                    yield f"event: error\ndata: {json.dumps(event)}\n\n"
+                    break
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            loop.run_until_complete(events.aclose())
+            loop.close()
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/metrics')
+def metrics():
+    """Prometheus text-format metrics"""
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/api/health')
 def health():
@@ -36,13 +202,18 @@ def health():
     return jsonify({
         'status': 'healthy',
         'service': 'Market Intelligence Swarm',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'snapshot_age': swarm.snapshot_age(),
+        'refreshing': swarm.is_refreshing()
     })
 
 if __name__ == '__main__':
-    # Initial intelligence gathering
     print("Initializing Market Intelligence Swarm...")
-    swarm.get_intelligence(force_refresh=True)
+    # The first crawl runs in the background so the port binds right away;
+    # until it finishes the last persisted snapshot (if any) is served.
+    # With the debug reloader only the serving child process crawls.
+    if not config.SERVER_CONFIG['debug'] or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        swarm.start_background_refresh()
     
     # Start Flask server
     app.run(
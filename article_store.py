@@ -0,0 +1,218 @@
+"""
+Article Store - Persistent SQLite store of collected documents with a dedup index
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only identify the referrer, not the story
+_TRACKING_PARAMS = re.compile(r'^(utm_.*|ref|ref_src|src|cmpid|\.tsrc|ncid|guccounter|fbclid|gclid|share_id)$', re.IGNORECASE)
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+# Titles shorter than this are too generic ("Daily Discussion") to dedupe on
+MIN_TITLE_WORDS = 4
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL: no scheme, www., fragment, tracking params or trailing slash"""
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(k)))
+    return urlunsplit(('', host, parts.path.rstrip('/'), query, ''))
+
+
+def normalize_title(title: str) -> str:
+    return _NON_WORD.sub(' ', (title or '').lower()).strip()
+
+
+def _digest(value: str) -> Optional[str]:
+    return hashlib.sha1(value.encode('utf-8')).hexdigest() if value else None
+
+
+def document_keys(doc: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """(url_hash, title_hash) used to recognise the same story from different feeds"""
+    url_hash = _digest(normalize_url(doc.get('link') or doc.get('url') or doc.get('permalink', '')))
+    title = normalize_title(doc.get('title', ''))
+    title_hash = _digest(title) if len(title.split()) >= MIN_TITLE_WORDS else None
+    return url_hash, title_hash
+
+
+def document_timestamp(doc: Dict) -> int:
+    """Publication time in epoch seconds (0 when unknown)
+
+    Collectors parse it once into `published_ts`; created_utc and ISO
+    `published` strings (naive ones taken as UTC) cover older payloads.
+    """
+    if doc.get('published_ts') is not None:
+        return int(doc['published_ts'])
+    if doc.get('created_utc'):
+        return int(doc['created_utc'])
+    published = doc.get('published')
+    if published:
+        try:
+            parsed = datetime.fromisoformat(published)
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return int(parsed.timestamp())
+        except ValueError:
+            pass
+    return 0
+
+
+def dedupe(docs: Iterable[Dict]) -> List[Dict]:
+    """Drop documents whose URL or title was already seen earlier in `docs`"""
+    seen = set()
+    unique = []
+    for doc in docs:
+        keys = [key for key in document_keys(doc) if key]
+        if any(key in seen for key in keys):
+            continue
+        seen.update(keys)
+        unique.append(doc)
+    return unique
+
+
+_TABLE = '''
+    CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY,
+        url_hash TEXT,
+        title_hash TEXT,
+        source_type TEXT NOT NULL,
+        published_ts INTEGER NOT NULL,
+        ingested_ts INTEGER NOT NULL,
+        score_version TEXT,
+        score TEXT,
+        payload TEXT NOT NULL
+    );
+'''
+_INDEXES = '''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_url_hash ON articles (source_type, url_hash);
+    CREATE INDEX IF NOT EXISTS idx_articles_title_hash ON articles (source_type, title_hash);
+    CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_ts);
+'''
+
+
+class ArticleStore:
+    """SQLite (WAL) table of every ingested article/post plus its stored score.
+
+    url_hash and title_hash are indexed per source type, so ingestion can
+    skip stories it already holds without re-scoring them, and historical
+    windows can be queried by publication time without re-crawling. A news
+    article and a Reddit link post to it are stored (and scored) separately.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        schema = self._conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'articles'").fetchone()
+        if schema is not None and 'url_hash TEXT UNIQUE' in schema[0]:
+            # Stores from before keys were per source type: rebuild without the global unique URL
+            self._conn.executescript('ALTER TABLE articles RENAME TO articles_old;' + _TABLE +
+                                     'INSERT INTO articles SELECT * FROM articles_old; DROP TABLE articles_old;')
+        self._conn.executescript(_TABLE + _INDEXES)
+        self._conn.commit()
+
+    def _find(self, kind: str, url_hash: Optional[str], title_hash: Optional[str]) -> Optional[tuple]:
+        query = 'SELECT score_version, score, payload FROM articles WHERE source_type = ? AND '
+        row = None
+        if url_hash:
+            row = self._conn.execute(query + 'url_hash = ?', (kind, url_hash)).fetchone()
+        if row is None and title_hash:
+            row = self._conn.execute(query + 'title_hash = ? LIMIT 1', (kind, title_hash)).fetchone()
+        return row
+
+    def contains(self, kind: str, doc: Dict) -> bool:
+        with self._lock:
+            return self._find(kind, *document_keys(doc)) is not None
+
+    def load_score(self, kind: str, doc: Dict, version: str, text_fields: Tuple[str, str]) -> Optional[list]:
+        """Stored score for a document of `kind`, if the same scorer version saw the same title/body"""
+        with self._lock:
+            row = self._find(kind, *document_keys(doc))
+        if row is None or row[0] != version or row[1] is None:
+            return None
+        stored = json.loads(row[2])
+        if any(stored.get(field, '') != doc.get(field, '') for field in text_fields):
+            return None
+        return json.loads(row[1])
+
+    def ingest(self, kind: str, items: Iterable[Tuple[Dict, Optional[tuple]]], version: str = None) -> int:
+        """Store (doc, score) pairs not already present for `kind`; returns how many were new"""
+        now = int(time.time())
+        added = 0
+        with self._lock:
+            for doc, score in items:
+                url_hash, title_hash = document_keys(doc)
+                if self._find(kind, url_hash, title_hash) is not None:
+                    continue
+                self._conn.execute(
+                    'INSERT INTO articles (url_hash, title_hash, source_type, published_ts, ingested_ts, '
+                    'score_version, score, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (url_hash, title_hash, kind, document_timestamp(doc), now, version,
+                     json.dumps(score) if score is not None else None, json.dumps(doc))
+                )
+                added += 1
+            self._conn.commit()
+        return added
+
+    def iter_window(self, since_ts: int, until_ts: int = None, source_type: str = None,
+                    batch_size: int = 1000) -> Iterator[Dict]:
+        """Stream stored documents published in [since_ts, until_ts), newest first"""
+        query = 'SELECT payload FROM articles WHERE published_ts >= ?'
+        params: list = [since_ts]
+        if until_ts is not None:
+            query += ' AND published_ts < ?'
+            params.append(until_ts)
+        if source_type:
+            query += ' AND source_type = ?'
+            params.append(source_type)
+        query += ' ORDER BY published_ts DESC'
+
+        # A private read connection: WAL lets it run alongside ingestion
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(query, params)
+            rows = cursor.fetchmany(batch_size)
+            while rows:
+                for (payload,) in rows:
+                    yield json.loads(payload)
+                rows = cursor.fetchmany(batch_size)
+        finally:
+            conn.close()
+
+    def query_window(self, since_ts: int, until_ts: int = None, source_type: str = None,
+                     limit: int = None) -> List[Dict]:
+        docs = []
+        for doc in self.iter_window(since_ts, until_ts, source_type):
+            docs.append(doc)
+            if limit and len(docs) >= limit:
+                break
+        return docs
+
+    def prune(self, older_than_ts: int) -> int:
+        """Delete documents ingested before `older_than_ts`"""
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM articles WHERE ingested_ts < ?', (older_than_ts,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
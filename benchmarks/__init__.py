@@ -0,0 +1,35 @@
+# Benchmarks Package
+import os
+import subprocess
+import tempfile
+from typing import List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scratch_environment(prefix: str = 'swarm-bench-', **overrides: str) -> str:
+    """Keep a benchmark away from the real caches and article database.
+
+    Must run before `config` is imported. Returns the scratch directory.
+    """
+    workdir = tempfile.mkdtemp(prefix=prefix)
+    os.environ['SWARM_CACHE_PERSIST'] = '0'
+    os.environ['SWARM_ARTICLE_DB'] = os.path.join(workdir, 'articles.sqlite3')
+    os.environ.update(overrides)
+    return workdir
+
+
+def use_stub_feeds(rss_urls: List[str], subreddits: List[str]):
+    """Route the configured feeds to a stub server and lift rate limits meant for real hosts"""
+    import config
+    config.NEWS_SOURCES['rss_feeds'] = rss_urls
+    config.NEWS_SOURCES['rss_rate_limit'] = 1e6
+    config.NEWS_SOURCES['reddit'].update(subreddits=subreddits, rate_limit=1e6, burst=1e6)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=ROOT, check=True).stdout.strip()
+    except Exception:
+        return None
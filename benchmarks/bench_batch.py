@@ -0,0 +1,95 @@
+"""
+Batch Benchmark - main.run_batch against a fake LLM and a fake search tool
+
+The fakes sleep for a fixed latency and record how many calls were in
+flight at once, so batch wall time and the --max-searches / --max-llm-calls
+caps are checked without Ollama or DuckDuckGo. Each competitor gets its
+own search results and every run starts with an empty in-memory analysis
+cache, so every analysis reaches the LLM. The run fails if either peak
+exceeds its cap or never reaches it.
+Usage: python -m benchmarks.bench_batch [--competitors 20] [--limits 1:1 4:2 8:4]
+                                        [--search-latency 0.05] [--llm-latency 0.2]
+"""
+from benchmarks import scratch_environment
+
+# Before config is imported, so caches stay in scratch space
+scratch_environment()
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from typing import Callable, Dict, List, Tuple
+from langchain_core.messages import AIMessage
+import main
+from cache import create_cache
+
+
+class FakeCalls:
+    """Stand-in for a LangChain tool or chat model: ainvoke sleeps, then answers `reply(input)`"""
+
+    def __init__(self, latency: float, reply: Callable[[str], object]):
+        self.latency = latency
+        self.reply = reply
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, value: str, *args, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            return self.reply(value)
+        finally:
+            self.in_flight -= 1
+
+
+async def _collect(competitors: List[str], max_searches: int, max_llm_calls: int) -> List[Dict]:
+    return [state async for state in main.run_batch(competitors, max_searches, max_llm_calls)]
+
+
+def measure(competitors: List[str], max_searches: int, max_llm_calls: int, search_latency: float,
+            llm_latency: float) -> Dict:
+    main.search_tool = search = FakeCalls(search_latency, lambda query: f"{query}: revenue grew. Margins held.")
+    main.llm = llm = FakeCalls(llm_latency, lambda prompt: AIMessage(content=f"Analysis of {len(prompt)} chars"))
+    main.analysis_cache = create_cache('analyses', max_size=512, default_ttl=main.ANALYSIS_CACHE_TTL, persist=False)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        states = asyncio.run(_collect(competitors, max_searches, max_llm_calls))
+    seconds = time.perf_counter() - start
+
+    failed = [state['competitor'] for state in states if state['analysis'].startswith('Research failed')]
+    assert not failed, f"research failed for {failed}"
+    for fake, cap in ((search, max_searches), (llm, max_llm_calls)):
+        assert fake.calls == len(competitors), f"{fake.calls} calls for {len(competitors)} competitors"
+        assert fake.max_in_flight == min(cap, len(competitors)), f"{fake.max_in_flight} in flight, cap {cap}"
+    return {'seconds': seconds, 'searches': search.max_in_flight, 'llm_calls': llm.max_in_flight,
+            'analyses': llm.calls}
+
+
+def parse_limits(value: str) -> Tuple[int, int]:
+    searches, llm_calls = value.split(':')
+    return int(searches), int(llm_calls)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--competitors', type=int, default=20)
+    parser.add_argument('--limits', type=parse_limits, nargs='+', default=[(1, 1), (4, 2), (8, 4)],
+                        help='max searches:max LLM calls pairs')
+    parser.add_argument('--search-latency', type=float, default=0.05, help='Fake search delay (seconds)')
+    parser.add_argument('--llm-latency', type=float, default=0.2, help='Fake LLM delay (seconds)')
+    args = parser.parse_args()
+
+    competitors = [f"Competitor {i}" for i in range(args.competitors)]
+    print(f"{args.competitors} competitors, search {args.search_latency * 1000:.0f} ms, "
+          f"LLM {args.llm_latency * 1000:.0f} ms")
+    print(f"{'limits':>8} {'seconds':>8} {'peak searches':>14} {'peak LLM calls':>15} {'analyses':>9}")
+    for max_searches, max_llm_calls in args.limits:
+        result = measure(competitors, max_searches, max_llm_calls, args.search_latency, args.llm_latency)
+        print(f"{f'{max_searches}:{max_llm_calls}':>8} {result['seconds']:>8.2f} {result['searches']:>14} "
+              f"{result['llm_calls']:>15} {result['analyses']:>9}")
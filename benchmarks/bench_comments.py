@@ -0,0 +1,163 @@
+"""
+Comments Benchmark - Comment-tree crawling on recorded threads (benchmarks/fixtures/reddit_comments)
+
+Three measurements against the stub server:
+  parsers  streaming (ijson, when installed) vs whole-body json.loads: time
+           to crawl every recorded thread over HTTP, the parser's peak memory
+           on the largest thread (read from memory, so the in-process stub's
+           buffers do not count) and a check that both return the same comments
+  pool     the reddit_comments source at several concurrency limits, with
+           the peak number of requests the stub saw in flight and, with
+           --rate, the shared Reddit token bucket throttling the crawl
+  scoring  Reddit sentiment and trending tickers without and with comments
+Usage: python -m benchmarks.bench_comments [--iterations 5] [--concurrency 1 2 4] [--latency 0.05] [--rate 20]
+"""
+from benchmarks import scratch_environment
+
+# Before config is imported, so caches and the article database stay in scratch space
+scratch_environment()
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+import tracemalloc
+from typing import Dict, List
+import numpy as np
+import config
+from benchmarks.bench_pipeline import new_orchestrator, point_config_at
+from benchmarks.stub_server import StubServer
+from data_collectors import reddit_comments
+from data_collectors.rate_limiter import TokenBucket
+from data_collectors.reddit_collector import RedditCollector
+from data_collectors.reddit_comments import CommentLimits
+from data_collectors.session import create_session
+from source_scheduler import SourceScheduler
+
+
+def recorded_posts(stub: StubServer) -> List[Dict]:
+    """One post dict per recorded thread"""
+    root = os.path.join(stub.fixtures_dir, 'reddit_comments')
+    return [{'subreddit': subreddit, 'permalink': f"https://reddit.com/r/{subreddit}/comments/{name[:-5]}/"}
+            for subreddit in sorted(os.listdir(root)) for name in sorted(os.listdir(os.path.join(root, subreddit)))]
+
+
+async def _crawl(collector: RedditCollector, posts: List[Dict], limits: CommentLimits) -> List[List[Dict]]:
+    async with create_session() as session:
+        return [await collector.fetch_comments_async(session, post, limits, strict=True) for post in posts]
+
+
+class RecordedBody:
+    """Response body stand-in serving recorded bytes through an async read()"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+
+    async def read(self, n: int = -1) -> bytes:
+        end = len(self.data) if n < 0 else self.position + n
+        chunk = self.data[self.position:end]
+        self.position += len(chunk)
+        return chunk
+
+    def at_eof(self) -> bool:
+        return self.position >= len(self.data)
+
+
+def measure_parser(stub: StubServer, streaming: bool, limits: CommentLimits, iterations: int) -> Dict:
+    collector = RedditCollector(base_url=f"{stub.base_url}/r")
+    posts = recorded_posts(stub)
+    root = os.path.join(stub.fixtures_dir, 'reddit_comments')
+    path = max((os.path.join(directory, name) for directory, _, names in os.walk(root) for name in names),
+               key=os.path.getsize)
+    with open(path, 'rb') as f:
+        largest = f.read()
+    installed = reddit_comments.ijson
+    reddit_comments.ijson = installed if streaming else None
+    try:
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            threads = asyncio.run(_crawl(collector, posts, limits))
+            timings.append(time.perf_counter() - start)
+        tracemalloc.start()
+        asyncio.run(reddit_comments.stream_comments(RecordedBody(largest), posts[0], limits))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        reddit_comments.ijson = installed
+    return {'threads': threads, 'p50_ms': float(np.median(timings)) * 1000, 'peak_kib': peak / 1024,
+            'largest_kib': len(largest) / 1024, 'comments': sum(len(thread) for thread in threads)}
+
+
+def measure_pool(stub: StubServer, orchestrator, concurrency: int, rate: float = None) -> Dict:
+    source = orchestrator.scheduler.sources['reddit_comments']
+    source.concurrency = concurrency
+    if rate:
+        # No burst allowance, so the bucket alone sets the pace
+        orchestrator.reddit_collector.rate_limiter = TokenBucket(rate, 1)
+    scheduler = SourceScheduler([source])
+    stub.max_in_flight = 0
+
+    async def run():
+        async with create_session() as session:
+            await scheduler.run(session, force=True)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(run())
+    result = scheduler.results['reddit_comments']
+    return {'seconds': time.perf_counter() - start, 'in_flight': stub.max_in_flight, 'items': len(result.items),
+            'missed': len(result.missed)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub server delay per response (seconds)')
+    parser.add_argument('--rate', type=float, help='Also crawl with the shared Reddit limiter at this many requests/s')
+    args = parser.parse_args()
+
+    settings = config.SOURCES_CONFIG['reddit_comments']
+    limits = CommentLimits(max_depth=settings['max_depth'], max_comments=settings['max_comments'],
+                           max_bytes=settings['max_bytes'])
+    with StubServer() as stub:
+        point_config_at(stub)
+        print(f"parsers ({len(recorded_posts(stub))} threads, {limits})")
+        print(f"{'parser':<12} {'crawl ms':>9} {'comments':>9} {'largest KiB':>12} {'peak KiB':>9}")
+        results = {}
+        for name, streaming in (('ijson', True), ('json.loads', False)):
+            if streaming and reddit_comments.ijson is None:
+                print(f"{name:<12} not installed")
+                continue
+            result = results[name] = measure_parser(stub, streaming, limits, args.iterations)
+            print(f"{name:<12} {result['p50_ms']:>9.1f} {result['comments']:>9,} {result['largest_kib']:>12,.0f} "
+                  f"{result['peak_kib']:>9,.0f}")
+        if len(results) == 2:
+            assert results['ijson']['threads'] == results['json.loads']['threads']
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            baseline = asyncio.run(new_orchestrator(stub).gather_intelligence(force=True))
+            settings['enabled'] = True
+            orchestrator = new_orchestrator(stub)
+            intelligence = asyncio.run(orchestrator.gather_intelligence(force=True))
+
+        stub.latency = args.latency
+        print(f"\npool (stub latency {args.latency * 1000:.0f} ms, {settings['posts']} posts)")
+        print(f"{'concurrency':>11} {'rate/s':>7} {'seconds':>8} {'in flight':>10} {'comments':>9} {'missed':>7}")
+        runs = [(concurrency, None) for concurrency in args.concurrency]
+        if args.rate:
+            runs += [(max(args.concurrency), args.rate)]
+        for concurrency, rate in runs:
+            result = measure_pool(stub, orchestrator, concurrency, rate)
+            print(f"{concurrency:>11} {rate or '-':>7} {result['seconds']:>8.2f} {result['in_flight']:>10} "
+                  f"{result['items']:>9,} {result['missed']:>7}")
+
+    print("\nscoring")
+    for name, data in (('posts only', baseline), ('with comments', intelligence)):
+        trending = ', '.join(f"{symbol} {count}" for symbol, count in list(data['trending_stocks'].items())[:5])
+        print(f"{name:<14} reddit {data['reddit_sentiment']}  tickers {len(data['per_ticker_sentiment'])}  "
+              f"trending {trending}")
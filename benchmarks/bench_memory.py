@@ -0,0 +1,145 @@
+"""
+Memory Benchmark - Aggregator state per document, dict window vs columnar DocumentBatch
+
+Retained memory is what the aggregator still holds after a sync once the
+caller has dropped its document list (measured with tracemalloc).
+Usage: python -m benchmarks.bench_memory [--sizes 10000 100000]
+"""
+import argparse
+import gc
+import heapq
+import random
+import time
+import tracemalloc
+from typing import Dict, List, NamedTuple, Tuple
+from benchmarks.bench_tickers import synthetic_docs
+from document_processor import DocumentProcessor, DocumentScore
+from incremental_aggregator import IncrementalAggregator
+from intelligence_engine import IntelligenceEngine
+
+FEEDS = ['CNBC Top News', 'Reuters Business', 'CNN Money', 'Yahoo Finance']
+SUBREDDITS = ['stocks', 'investing', 'StockMarket', 'wallstreetbets']
+
+
+class TrackedDocument(NamedTuple):
+    fingerprint: Tuple[str, str]
+    score: DocumentScore
+    doc: Dict
+
+
+class LegacyAggregator(DocumentProcessor):
+    """The dict-per-document window the aggregator kept before DocumentBatch"""
+
+    def __init__(self, engine, top_n: int = 10):
+        super().__init__(engine, top_n)
+        self.documents: Dict[str, Dict[str, TrackedDocument]] = {'rss': {}, 'reddit': {}}
+        self._window: Dict[str, List[Dict]] = {'rss': [], 'reddit': []}
+
+    def sync(self, kind: str, docs: List[Dict]):
+        tracked = self.documents[kind]
+        current = {}
+        window = []
+        to_score = []
+        for doc in docs:
+            key = IncrementalAggregator.document_key(doc)
+            if key in current:
+                continue
+            fingerprint = IncrementalAggregator.fingerprint(doc, kind)
+            previous = tracked.pop(key, None)
+            window.append(doc)
+            if previous is not None and previous.fingerprint == fingerprint:
+                current[key] = previous._replace(doc=doc)
+                continue
+            if previous is not None:
+                self.retract(previous.score)
+            to_score.append((key, fingerprint, doc))
+            current[key] = None
+        scores = self.score_batch([doc for _, _, doc in to_score], kind) if to_score else []
+        for (key, fingerprint, doc), score in zip(to_score, scores):
+            self.apply(score)
+            current[key] = TrackedDocument(fingerprint, score, doc)
+        for stale in tracked.values():
+            self.retract(stale.score)
+        self.documents[kind] = current
+        self._window[kind] = window
+
+    def top_news(self) -> List[Dict]:
+        return heapq.nlargest(self.top_n, self._window['rss'], key=lambda x: x.get('published', ''))
+
+    def top_reddit(self) -> List[Dict]:
+        return heapq.nlargest(self.top_n, self._window['reddit'], key=lambda x: x.get('score', 0))
+
+
+def corpus(n: int, seed: int = 5) -> Tuple[List[Dict], List[Dict]]:
+    """n documents shaped like collector output: half RSS articles, half Reddit posts"""
+    rng = random.Random(seed)
+    texts = synthetic_docs(n)
+    news, reddit = [], []
+    for i, text in enumerate(texts):
+        created = 1_700_000_000 + rng.randrange(30 * 86400)
+        if i % 2:
+            subreddit = rng.choice(SUBREDDITS)
+            reddit.append({
+                'title': text['title'], 'url': f"https://example.com/{i}", 'selftext': text['selftext'],
+                'score': rng.randrange(5000), 'num_comments': rng.randrange(300), 'created_utc': created,
+                'subreddit': subreddit, 'source_type': 'reddit',
+                'permalink': f"https://reddit.com/r/{subreddit}/comments/{i:x}/"
+            })
+        else:
+            news.append({
+                'title': text['title'], 'link': f"https://news.example.com/story/{i}", 'summary': text['selftext'],
+                'published': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(created)),
+                'source': rng.choice(FEEDS), 'source_type': 'rss'
+            })
+    return news, reddit
+
+
+def _sync(factory, engine: IntelligenceEngine, news: List[Dict], reddit: List[Dict]):
+    aggregator = factory(engine)
+    aggregator.sync('rss', news)
+    aggregator.sync('reddit', reddit)
+    return aggregator
+
+
+def measure(factory, size: int, engine: IntelligenceEngine) -> Dict:
+    news, reddit = corpus(size)
+    start = time.perf_counter()
+    aggregator = _sync(factory, engine, news, reddit)
+    sync_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(10):
+        aggregator.top_news()
+        aggregator.top_reddit()
+    top_seconds = (time.perf_counter() - start) / 10
+    del news, reddit, aggregator
+
+    # A second, traced pass so tracing does not skew the timings
+    gc.collect()
+    tracemalloc.start()
+    news, reddit = corpus(size)
+    aggregator = _sync(factory, engine, news, reddit)
+    del news, reddit
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'retained': retained, 'sync': sync_seconds, 'top': top_seconds, 'aggregator': aggregator}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    engine = IntelligenceEngine()
+    print(f"{'documents':>10} {'layout':<14} {'retained MiB':>13} {'bytes/doc':>10} {'sync s':>8} {'top-N ms':>9}")
+    for size in args.sizes:
+        results = {}
+        for name, factory in (('dict window', LegacyAggregator), ('DocumentBatch', IncrementalAggregator)):
+            result = results[name] = measure(factory, size, engine)
+            print(f"{size:>10,} {name:<14} {result['retained'] / 2**20:>13.1f} {result['retained'] / size:>10,.0f} "
+                  f"{result['sync']:>8.2f} {result['top'] * 1000:>9.2f}")
+        legacy, batch = results['dict window']['aggregator'], results['DocumentBatch']['aggregator']
+        assert legacy.top_reddit() == batch.top_reddit() and legacy.per_ticker == batch.per_ticker
+        saved = 1 - results['DocumentBatch']['retained'] / results['dict window']['retained']
+        print(f"{'':>10} {'saved':<14} {saved:>13.0%}")
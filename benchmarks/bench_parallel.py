@@ -0,0 +1,36 @@
+"""
+Parallel Scoring Benchmark - Backfill throughput by number of worker processes
+
+Usage: python -m benchmarks.bench_parallel [--docs 200000] [--workers 1 2 4 8] [--shard-size 2000]
+"""
+import argparse
+import os
+import time
+from typing import List
+from benchmarks.bench_tickers import synthetic_docs
+from intelligence_engine import IntelligenceEngine
+from parallel_scoring import ParallelScorer
+
+
+def run(n_docs: int, workers: List[int], shard_size: int):
+    engine = IntelligenceEngine()
+    docs = synthetic_docs(n_docs)
+    print(f"docs={n_docs} shard_size={shard_size} cpus={os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>9} {'docs/s':>11} {'speedup':>8}")
+    baseline = None
+    for count in workers:
+        with ParallelScorer(engine, workers=count, shard_size=shard_size) as scorer:
+            start = time.perf_counter()
+            scorer.score(docs, kind='reddit')
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{count:>8} {elapsed:>9.2f} {n_docs / elapsed:>11,.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--shard-size', type=int, default=2000)
+    args = parser.parse_args()
+    run(args.docs, args.workers, args.shard_size)
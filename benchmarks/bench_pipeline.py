@@ -0,0 +1,189 @@
+"""
+Pipeline Benchmark - End-to-end refresh, per-collector and aggregation timings on recorded fixtures
+
+Every upstream (RSS, Reddit, Yahoo Finance) is replaced by a local stub
+server serving benchmarks/fixtures, so results only depend on this code.
+Usage:
+  python -m benchmarks.bench_pipeline [--iterations 20] [--sizes 1000 10000 100000]
+                                      [--latency 0.0] [--output results.json] [--compare baseline.json]
+"""
+from benchmarks import git_commit, scratch_environment, use_stub_feeds
+
+# Before config is imported, so caches and the article database stay in scratch space
+_WORKDIR = scratch_environment()
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+import numpy as np
+import config
+from benchmarks.stub_server import StubServer, fixture_downloader
+from data_collectors.financial_collector import FinancialCollector
+from data_collectors.reddit_collector import RedditCollector
+from data_collectors.rss_collector import RSSCollector
+from data_collectors.session import create_session
+from intelligence_engine import IntelligenceEngine
+from swarm_orchestrator import SwarmOrchestrator
+
+_db_ids = itertools.count()
+
+
+def point_config_at(stub: StubServer):
+    """Route the configured feeds to the stub and lift rate limits meant for real hosts"""
+    use_stub_feeds(stub.rss_urls(), stub.subreddits())
+
+
+def new_orchestrator(stub: StubServer) -> SwarmOrchestrator:
+    # A fresh article database per orchestrator, so cold runs really are cold
+    config.STORAGE_CONFIG['article_db'] = os.path.join(_WORKDIR, f"articles-{next(_db_ids)}.sqlite3")
+    orchestrator = SwarmOrchestrator()
+    orchestrator.reddit_collector = RedditCollector(base_url=f"{stub.base_url}/r")
+    orchestrator.financial_collector = FinancialCollector(
+        downloader=fixture_downloader(f"{stub.base_url}/yfinance/yfinance_indices.json"))
+    return orchestrator
+
+
+def measure(name: str, run: Callable[[object], int], iterations: int,
+            setup: Callable[[], object] = None) -> Dict:
+    """Time `run(setup())` repeatedly; run returns how many documents it handled"""
+    timings = []
+    docs = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(iterations):
+            state = setup() if setup else None
+            start = time.perf_counter()
+            docs = run(state)
+            timings.append(time.perf_counter() - start)
+
+        # One extra pass under tracemalloc, so tracing does not skew the timings
+        state = setup() if setup else None
+        tracemalloc.start()
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    p50, p95 = np.percentile(timings, [50, 95])
+    return {
+        'name': name,
+        'iterations': iterations,
+        'p50_ms': round(p50 * 1000, 3),
+        'p95_ms': round(p95 * 1000, 3),
+        'mean_ms': round(float(np.mean(timings)) * 1000, 3),
+        'docs': docs,
+        'docs_per_sec': round(docs / p50, 1) if p50 else None,
+        'peak_kib': round(peak / 1024, 1)
+    }
+
+
+async def _collect_rss(collector: RSSCollector) -> List[Dict]:
+    async with create_session() as session:
+        return await collector.collect_all_async(session, config.NEWS_SOURCES['rss_feeds'])
+
+
+async def _collect_reddit(collector: RedditCollector) -> List[Dict]:
+    async with create_session() as session:
+        return await collector.collect_all_async(session, config.NEWS_SOURCES['reddit']['subreddits'])
+
+
+def build_corpus(news: List[Dict], reddit: List[Dict], size: int):
+    """`size` documents (half news, half Reddit) made by varying the fixture documents"""
+    def expand(docs: List[Dict], n: int, link_field: str) -> List[Dict]:
+        out = []
+        for i in range(n):
+            doc = dict(docs[i % len(docs)])
+            doc['title'] = f"{doc['title']} ({i // len(docs)})"
+            doc[link_field] = f"{doc.get(link_field, '')}#{i}"
+            out.append(doc)
+        return out
+    return expand(news, size // 2, 'link'), expand(reddit, size - size // 2, 'permalink')
+
+
+def run(iterations: int, sizes: List[int], latency: float) -> Dict:
+    results = []
+    with StubServer(latency=latency) as stub:
+        point_config_at(stub)
+        financial_url = f"{stub.base_url}/yfinance/yfinance_indices.json"
+
+        results.append(measure('collector.rss', lambda c: len(asyncio.run(_collect_rss(c))), iterations,
+                               setup=RSSCollector))
+        results.append(measure('collector.reddit', lambda c: len(asyncio.run(_collect_reddit(c))), iterations,
+                               setup=lambda: RedditCollector(base_url=f"{stub.base_url}/r")))
+        results.append(measure('collector.financial', lambda c: len(c.get_market_indices()), iterations,
+                               setup=lambda: FinancialCollector(downloader=fixture_downloader(financial_url))))
+
+        def gather(orchestrator: SwarmOrchestrator) -> int:
+            asyncio.run(orchestrator.gather_intelligence(force=True))
+            return len(orchestrator.aggregator.documents['rss']) + len(orchestrator.aggregator.documents['reddit'])
+
+        results.append(measure('pipeline.gather_cold', gather, iterations, setup=lambda: new_orchestrator(stub)))
+        warm = new_orchestrator(stub)
+        with contextlib.redirect_stdout(io.StringIO()):
+            gather(warm)
+        results.append(measure('pipeline.gather_warm', gather, iterations, setup=lambda: warm))
+
+        news = asyncio.run(_collect_rss(RSSCollector()))
+        reddit = asyncio.run(_collect_reddit(RedditCollector(base_url=f"{stub.base_url}/r")))
+        financial = FinancialCollector(downloader=fixture_downloader(financial_url)).get_market_indices()
+
+    engine = IntelligenceEngine()
+    for size in sizes:
+        corpus_news, corpus_reddit = build_corpus(news, reddit, size)
+        results.append(measure(
+            f"engine.aggregate_{size}",
+            lambda _: engine.aggregate_intelligence(corpus_news, corpus_reddit, financial) and size,
+            max(3, min(iterations, 200_000 // size))
+        ))
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'latency_ms': latency * 1000,
+        'results': results
+    }
+
+
+def print_report(report: Dict, baseline: Dict = None):
+    previous = {r['name']: r for r in baseline['results']} if baseline else {}
+    print(f"commit={report['commit']} python={report['python']} cpus={report['cpus']} "
+          f"stub latency={report['latency_ms']:.0f}ms")
+    header = f"{'case':<24} {'p50 ms':>10} {'p95 ms':>10} {'docs':>8} {'docs/s':>12} {'peak KiB':>10}"
+    print(header + (f" {'p50 vs base':>12}" if baseline else ''))
+    for r in report['results']:
+        line = (f"{r['name']:<24} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} {r['docs']:>8} "
+                f"{r['docs_per_sec'] or 0:>12,.0f} {r['peak_kib']:>10,.0f}")
+        if r['name'] in previous and previous[r['name']]['p50_ms']:
+            change = (r['p50_ms'] / previous[r['name']]['p50_ms'] - 1) * 100
+            line += f" {change:>+11.1f}%"
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--latency', type=float, default=0.0, help='Stub server delay per response (seconds)')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--compare', help='Earlier --output file to compare p50 latencies against')
+    args = parser.parse_args()
+
+    report = run(args.iterations, args.sizes, args.latency)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,69 @@
+"""
+Quote Benchmark - Serial per-symbol vs batched FinancialCollector quotes
+
+Runs offline against a fake data provider that charges a fixed latency per
+round-trip. Usage: python -m benchmarks.bench_quotes [--symbols 20] [--latency 0.15]
+"""
+from benchmarks import scratch_environment
+
+# Before config is imported, so the quote cache stays in memory
+scratch_environment()
+
+import argparse
+import time
+from typing import List
+import numpy as np
+import pandas as pd
+from data_collectors.financial_collector import FinancialCollector
+
+
+class FakeProvider:
+    """Returns synthetic 5-day history and counts simulated round-trips"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.round_trips = 0
+
+    def download(self, symbols: List[str], period: str) -> pd.DataFrame:
+        self.round_trips += 1
+        time.sleep(self.latency)
+        index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=5)
+        rng = np.random.default_rng(len(symbols))
+        columns = pd.MultiIndex.from_product([['Open', 'High', 'Low', 'Close', 'Volume'], symbols])
+        return pd.DataFrame(rng.uniform(50, 500, (5, len(columns))), index=index, columns=columns)
+
+    def info(self, symbol: str) -> dict:
+        self.round_trips += 1
+        time.sleep(self.latency)
+        return {'longName': symbol}
+
+
+def run(n_symbols: int, latency: float):
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+
+    # Previous behaviour: .info plus .history for every symbol, one after another
+    provider = FakeProvider(latency)
+    start = time.perf_counter()
+    for symbol in symbols:
+        provider.info(symbol)
+        FinancialCollector.compute_quotes(provider.download([symbol], "5d"), [symbol])
+    serial = time.perf_counter() - start
+    serial_trips = provider.round_trips
+
+    provider = FakeProvider(latency)
+    collector = FinancialCollector(downloader=provider.download)
+    start = time.perf_counter()
+    quotes = collector.get_quotes(symbols)
+    batched = time.perf_counter() - start
+
+    print(f"symbols={n_symbols} latency={latency * 1000:.0f}ms")
+    print(f"  serial : {serial * 1000:8.1f} ms  ({serial_trips} round-trips)")
+    print(f"  batched: {batched * 1000:8.1f} ms  ({provider.round_trips} round-trip, {len(quotes)} quotes)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.15)
+    args = parser.parse_args()
+    run(args.symbols, args.latency)
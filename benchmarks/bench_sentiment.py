@@ -0,0 +1,68 @@
+"""
+Sentiment Microbenchmark - Documents/sec for the compiled lexicon
+
+Usage: python -m benchmarks.bench_sentiment [--sizes 10000 100000 1000000]
+"""
+import argparse
+import random
+import time
+from typing import List
+from sentiment_lexicon import SentimentLexicon
+
+NEUTRAL_WORDS = [
+    'market', 'shares', 'supply', 'Dropbox', 'earnings', 'guidance', 'revenue', 'the',
+    'company', 'quarter', 'analysts', 'expect', 'Fed', 'rates', 'AI', 'chips', 'demand',
+    'investors', 'report', 'said', 'on', 'in', 'of', 'a', 'to', 'and', 'for', 'record',
+    'outlook', 'CEO', 'sales', 'growth', 'after', 'year', 'billion', 'percent', 'index'
+]
+SENTIMENT_WORDS = ['bullish', 'bearish', 'surge', 'plunge', 'up', 'down', 'buy', 'sell', 'gains', 'drop']
+
+
+def synthetic_posts(n: int, words_per_post: int = 40, hit_rate: float = 0.06, seed: int = 7) -> List[str]:
+    """Build n random posts where roughly `hit_rate` of words carry sentiment"""
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(n):
+        words = [rng.choice(SENTIMENT_WORDS) if rng.random() < hit_rate else rng.choice(NEUTRAL_WORDS)
+                 for _ in range(words_per_post)]
+        posts.append(' '.join(words) + '.')
+    return posts
+
+
+def legacy_analyze(text: str):
+    """The original per-call substring scan, kept for comparison"""
+    positive_words = ['bull', 'bullish', 'up', 'rise', 'gain', 'profit', 'buy', 'moon', 'rocket', 'surge']
+    negative_words = ['bear', 'bearish', 'down', 'fall', 'loss', 'crash', 'sell', 'dump', 'plunge', 'drop']
+    text_lower = text.lower()
+    positive_count = sum(1 for word in positive_words if word in text_lower)
+    negative_count = sum(1 for word in negative_words if word in text_lower)
+    return positive_count, negative_count
+
+
+def run(sizes: List[int]):
+    lexicon = SentimentLexicon()
+    print(f"{'docs':>10} {'legacy docs/s':>15} {'per-doc docs/s':>16} {'batch docs/s':>14} {'speedup':>8}")
+    for n in sizes:
+        posts = synthetic_posts(n)
+
+        start = time.perf_counter()
+        for post in posts:
+            legacy_analyze(post)
+        legacy = n / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for post in posts:
+            lexicon.count(post)
+        per_doc = n / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        lexicon.score_batch(posts)
+        batch = n / (time.perf_counter() - start)
+
+        print(f"{n:>10} {legacy:>15,.0f} {per_doc:>16,.0f} {batch:>14,.0f} {batch / legacy:>7.2f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    run(parser.parse_args().sizes)
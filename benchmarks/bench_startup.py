@@ -0,0 +1,164 @@
+"""
+Startup Benchmark - Import times and how long app.py takes to answer requests
+
+Every measurement runs in a fresh interpreter:
+  import.<module>       seconds spent importing the module (interpreter start excluded)
+  app.health_cold       launch -> first 200 from /api/health, nothing persisted yet
+  app.health_warm       launch -> first 200 from /api/health, snapshot persisted on disk
+  app.intelligence_warm launch -> first 200 from /api/intelligence from the persisted snapshot
+
+Servers are launched through benchmarks.stub_app, so their background crawl
+hits a local StubServer instead of the real RSS, Reddit and Yahoo upstreams
+and the timings do not depend on the network. Each server is stopped as
+soon as its check passes.
+Usage:
+  python -m benchmarks.bench_startup [--runs 5] [--output results.json]
+"""
+import os
+from benchmarks import ROOT, git_commit, scratch_environment
+
+# Persisted snapshot and article database live in a scratch directory
+_WORKDIR = scratch_environment('swarm-startup-', SWARM_CACHE_PERSIST='1')
+_WARM_CACHE = os.path.join(_WORKDIR, 'warm-cache')
+os.environ['SWARM_CACHE_DIR'] = _WARM_CACHE
+
+import argparse
+import json
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from typing import Dict, List, Optional
+from benchmarks.stub_server import StubServer
+MODULES = ['app', 'main', 'swarm_orchestrator']
+STARTUP_TIMEOUT = 60
+
+
+def import_seconds(module: str) -> float:
+    code = (f"import time; start = time.perf_counter(); import {module}; "
+            f"print(time.perf_counter() - start)")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True,
+                            env=_child_env(os.path.join(_WORKDIR, 'import-cache')), check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def seed_snapshot():
+    """Persist an (empty) intelligence snapshot the way a finished refresh would"""
+    import config
+    from cache import create_cache
+    from intelligence_engine import IntelligenceEngine
+    cache = create_cache('orchestrator', max_size=16, default_ttl=config.SWARM_CONFIG['cache_duration'])
+    cache.set('intelligence', IntelligenceEngine().aggregate_intelligence([], [], []))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _child_env(cache_dir: str, port: int = 0, stub: StubServer = None) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        'SWARM_CACHE_DIR': cache_dir,
+        'SWARM_ARTICLE_DB': os.path.join(_WORKDIR, f"articles-{port}.sqlite3"),
+        'SWARM_HOST': '127.0.0.1',
+        'SWARM_PORT': str(port),
+        'SWARM_DEBUG': '0',
+    })
+    if stub is not None:
+        # Read by benchmarks.stub_app, the way bench_pipeline.point_config_at configures its orchestrators
+        env['SWARM_BENCH_STUB'] = json.dumps({'base_url': stub.base_url, 'rss_feeds': stub.rss_urls(),
+                                              'subreddits': stub.subreddits()})
+    return env
+
+
+def _wait_for(url: str, start: float, process: subprocess.Popen) -> Optional[float]:
+    while time.perf_counter() - start < STARTUP_TIMEOUT and process.poll() is None:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - start
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def time_to_ok(stub: StubServer, cache_dir: str, path: str) -> Optional[float]:
+    """Seconds from launching app.py (against the stub) until `path` answers 200"""
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'benchmarks.stub_app'], cwd=ROOT,
+                               env=_child_env(cache_dir, port, stub),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        return _wait_for(f"http://127.0.0.1:{port}{path}", start, process)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def summarize(name: str, samples: List[Optional[float]]) -> Dict:
+    ok = [s for s in samples if s is not None]
+    return {
+        'name': name,
+        'runs': len(samples),
+        'failures': len(samples) - len(ok),
+        'median_ms': round(statistics.median(ok) * 1000, 1) if ok else None,
+        'min_ms': round(min(ok) * 1000, 1) if ok else None,
+        'max_ms': round(max(ok) * 1000, 1) if ok else None
+    }
+
+
+def run(runs: int) -> Dict:
+    results = [summarize(f"import.{module}", [import_seconds(module) for _ in range(runs)])
+               for module in MODULES]
+
+    with StubServer() as stub:
+        cold = [time_to_ok(stub, tempfile.mkdtemp(dir=_WORKDIR, prefix='cold-'), '/api/health')
+                for _ in range(runs)]
+        results.append(summarize('app.health_cold', cold))
+
+        seed_snapshot()
+        results.append(summarize('app.health_warm',
+                                 [time_to_ok(stub, _WARM_CACHE, '/api/health') for _ in range(runs)]))
+        results.append(summarize('app.intelligence_warm',
+                                 [time_to_ok(stub, _WARM_CACHE, '/api/intelligence') for _ in range(runs)]))
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results
+    }
+
+
+def print_report(report: Dict):
+    print(f"commit={report['commit']} python={report['python']} cpus={report['cpus']}")
+    print(f"{'case':<26} {'median ms':>10} {'min ms':>10} {'max ms':>10} {'failures':>9}")
+    for r in report['results']:
+        values = [f"{r[key]:>10.1f}" if r[key] is not None else f"{'-':>10}"
+                  for key in ('median_ms', 'min_ms', 'max_ms')]
+        print(f"{r['name']:<26} {' '.join(values)} {r['failures']:>9}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    report = run(args.runs)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,175 @@
+"""
+Stream Benchmark - Fan-out latency and bandwidth of /api/intelligence/stream under many clients
+
+The Flask app is served on a local port and N SSE clients (aiohttp, one
+event loop on its own thread) stay connected while synthetic refreshes are
+published through the orchestrator's DeltaBroadcaster. Each refresh slides
+a window over generated documents, so it brings new stories and per-ticker
+changes, and moves the index quotes.
+
+Reported per client count: publish time (diff, encode once, enqueue for
+every client), delivery latency from publish to each client, and bytes per
+client per refresh against polling the full snapshot (plain and gzip).
+Clients share the server's process and CPU, so latencies are an upper bound.
+Usage: python -m benchmarks.bench_stream [--clients 10 100 250] [--refreshes 20] [--window 2000] [--step 50]
+"""
+from benchmarks import scratch_environment
+
+# Before config is imported, so caches stay in scratch space and nothing is stored
+scratch_environment(SWARM_STORAGE_ENABLED='0')
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import random
+import threading
+import time
+from typing import Dict, List
+import numpy as np
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from werkzeug.serving import make_server
+from app import app, swarm
+from benchmarks.bench_memory import corpus
+from incremental_aggregator import IncrementalAggregator
+from snapshot import SerializedSnapshot
+
+INDICES = {'^GSPC': 5000.0, '^DJI': 38000.0, '^IXIC': 16000.0, '^RUT': 2000.0}
+
+
+class Refreshes:
+    """Successive snapshots from a window of documents sliding `step` documents per refresh"""
+
+    def __init__(self, window: int, step: int, refreshes: int, seed: int = 7):
+        self.window, self.step = window, step
+        self.news, self.reddit = corpus(window + step * (refreshes + 1))
+        self.aggregator = IncrementalAggregator(swarm.intelligence_engine)
+        self.rng = random.Random(seed)
+        self.prices = dict(INDICES)
+        self.count = 0
+
+    def next(self) -> SerializedSnapshot:
+        start = self.count * self.step // 2
+        self.count += 1
+        self.aggregator.sync('rss', self.news[start:start + self.window // 2])
+        self.aggregator.sync('reddit', self.reddit[start:start + self.window // 2])
+        indices = []
+        for symbol, price in self.prices.items():
+            change = round(price * self.rng.gauss(0, 0.001), 2)
+            self.prices[symbol] = price + change
+            indices.append({'symbol': symbol, 'name': symbol, 'price': round(price + change, 2), 'change': change,
+                            'change_percent': round(change / price * 100, 2)})
+        return SerializedSnapshot(swarm.intelligence_engine.build_intelligence(self.aggregator, indices))
+
+
+class Client:
+    """One SSE connection recording when each delta id arrived and how many bytes came in"""
+
+    def __init__(self):
+        self.received: Dict[int, float] = {}
+        self.bytes = 0
+        self.connected = False
+
+    async def run(self, session: ClientSession, url: str):
+        event_id = None
+        async with session.get(url) as response:
+            self.connected = True
+            async for line in response.content:
+                self.bytes += len(line)
+                if line.startswith(b'id: '):
+                    event_id = int(line[4:])
+                elif line == b'\n' and event_id is not None:
+                    self.received[event_id] = time.time()
+                    event_id = None
+
+
+def _serve_clients(url: str, clients: List[Client]):
+    async def main():
+        connector = TCPConnector(limit=0)
+        async with ClientSession(connector=connector, timeout=ClientTimeout(total=None)) as session:
+            await asyncio.gather(*(client.run(session, url) for client in clients), return_exceptions=True)
+    asyncio.run(main())
+
+
+def _wait_for(condition, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def measure(url: str, refreshes: Refreshes, n_clients: int, count: int, interval: float) -> Dict:
+    clients = [Client() for _ in range(n_clients)]
+    thread = threading.Thread(target=_serve_clients, args=(url, clients), daemon=True)
+    thread.start()
+    if not _wait_for(lambda: len(swarm.deltas) >= n_clients, timeout=30):
+        raise RuntimeError(f"only {len(swarm.deltas)} of {n_clients} clients connected")
+    baseline_bytes = sum(client.bytes for client in clients)
+
+    published: Dict[int, float] = {}
+    publish_seconds, full_bytes, gzip_bytes = [], [], []
+    for _ in range(count):
+        snapshot = refreshes.next()
+        start = time.perf_counter()
+        delta = swarm.deltas.publish(snapshot)
+        publish_seconds.append(time.perf_counter() - start)
+        full_bytes.append(len(snapshot.body))
+        gzip_bytes.append(len(snapshot.gzip))
+        if delta is None:
+            continue
+        published[delta['seq']] = delta['published_at']
+        _wait_for(lambda: all(delta['seq'] in client.received for client in clients), timeout=5)
+        time.sleep(interval)
+
+    swarm.deltas.close()
+    thread.join(timeout=10)
+
+    latencies = [client.received[seq] - at for client in clients for seq, at in published.items()
+                 if seq in client.received]
+    expected = len(published) * n_clients
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies else (0, 0, 0)
+    per_client = (sum(client.bytes for client in clients) - baseline_bytes) / n_clients / max(count, 1)
+    return {
+        'clients': n_clients,
+        'deltas': len(published),
+        'delivered': len(latencies) / expected if expected else 1.0,
+        'publish_ms': float(np.median(publish_seconds)) * 1000,
+        'p50_ms': p50 * 1000, 'p95_ms': p95 * 1000, 'p99_ms': p99 * 1000,
+        'max_ms': max(latencies, default=0) * 1000,
+        'delta_bytes': per_client,
+        'full_bytes': float(np.mean(full_bytes)),
+        'gzip_bytes': float(np.mean(gzip_bytes))
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, nargs='+', default=[10, 100, 250])
+    parser.add_argument('--refreshes', type=int, default=20)
+    parser.add_argument('--window', type=int, default=2000, help='Documents in each snapshot')
+    parser.add_argument('--step', type=int, default=50, help='Documents replaced per refresh')
+    parser.add_argument('--interval', type=float, default=0.05, help='Pause between refreshes (seconds)')
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # no access log line per client
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.port}/api/intelligence/stream"
+    refreshes = Refreshes(args.window, args.step, args.refreshes * len(args.clients))
+    with contextlib.redirect_stdout(io.StringIO()):
+        # The first snapshot is the base the deltas are computed against
+        swarm.deltas.publish(refreshes.next())
+
+    print(f"{'clients':>8} {'deltas':>7} {'delivered':>10} {'publish ms':>11} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'B/client':>9} {'poll B':>9} {'poll gz B':>10} {'vs gzip':>8}")
+    for n_clients in args.clients:
+        result = measure(url, refreshes, n_clients, args.refreshes, args.interval)
+        print(f"{result['clients']:>8} {result['deltas']:>7} {result['delivered']:>10.1%} "
+              f"{result['publish_ms']:>11.2f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {result['max_ms']:>8.1f} {result['delta_bytes']:>9,.0f} "
+              f"{result['full_bytes']:>9,.0f} {result['gzip_bytes']:>10,.0f} "
+              f"{1 - result['delta_bytes'] / result['gzip_bytes']:>8.0%}")
+    server.shutdown()
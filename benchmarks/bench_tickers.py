@@ -0,0 +1,103 @@
+"""
+Ticker Benchmark - Extraction throughput and per_ticker memory, legacy regex vs ticker universe
+
+Usage: python -m benchmarks.bench_tickers [--sizes 10000 100000]
+"""
+import argparse
+import gc
+import random
+import re
+import string
+import time
+import tracemalloc
+from typing import List, Tuple
+from benchmarks.bench_sentiment import NEUTRAL_WORDS, SENTIMENT_WORDS
+from document_processor import DocumentProcessor
+from intelligence_engine import IntelligenceEngine
+
+LEGACY_PATTERN = re.compile(r'\$?[A-Z]{1,5}\b')
+TICKERS = ['AAPL', 'TSLA', 'NVDA', 'AMD', 'GME', 'SPY', 'MSFT', 'PLTR', 'AMZN', 'META']
+SHOUTING = ['CEO', 'THE', 'US', 'IPO', 'EPS', 'YOLO', 'FOMO', 'A', 'I', 'ATH', 'DD', 'IMO']
+
+
+class LegacyEngine(IntelligenceEngine):
+    """The original regex: every capitalized word is a ticker"""
+
+    def extract_tickers_batch(self, texts: List[str]) -> List[Tuple[str, ...]]:
+        return [tuple(m.replace('$', '').upper() for m in LEGACY_PATTERN.findall(text)) for text in texts]
+
+
+def synthetic_docs(n: int, words_per_doc: int = 40, seed: int = 11) -> List[dict]:
+    """Posts mixing tickers, cashtags, shouting and random acronyms (which the legacy regex keeps)"""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        words = []
+        for _ in range(words_per_doc):
+            roll = rng.random()
+            if roll < 0.03:
+                words.append(rng.choice(TICKERS))
+            elif roll < 0.04:
+                words.append('$' + rng.choice(TICKERS))
+            elif roll < 0.08:
+                words.append(rng.choice(SHOUTING))
+            elif roll < 0.09:
+                words.append(''.join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 5))))
+            elif roll < 0.15:
+                words.append(rng.choice(SENTIMENT_WORDS))
+            else:
+                words.append(rng.choice(NEUTRAL_WORDS))
+        docs.append({'title': ' '.join(words[:8]), 'selftext': ' '.join(words[8:]), 'score': i})
+    return docs
+
+
+def throughput(docs: List[dict], engine: IntelligenceEngine):
+    texts = [f"{doc['title']} {doc['selftext']}" for doc in docs]
+
+    start = time.perf_counter()
+    for text in texts:
+        LEGACY_PATTERN.findall(text)
+    legacy = len(texts) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for text in texts:
+        engine.extract_tickers(text)
+    per_doc = len(texts) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    engine.extract_tickers_batch(texts)
+    batch = len(texts) / (time.perf_counter() - start)
+    return legacy, per_doc, batch
+
+
+def per_ticker_memory(docs: List[dict], engine: IntelligenceEngine) -> Tuple[int, int]:
+    """(distinct tickers, bytes still held by the processor's per-ticker state)"""
+    gc.collect()
+    tracemalloc.start()
+    processor = DocumentProcessor(engine).consume(docs, kind='reddit')
+    processor._top_reddit.clear()
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(processor.per_ticker), held
+
+
+def run(sizes: List[int]):
+    engine = IntelligenceEngine()
+    legacy_engine = LegacyEngine()
+    print(f"universe: {len(engine.universe)} symbols")
+    print(f"{'docs':>8} {'legacy docs/s':>14} {'per-doc docs/s':>15} {'batch docs/s':>13} "
+          f"{'legacy tickers':>15} {'legacy KiB':>11} {'tickers':>8} {'KiB':>8}")
+    for n in sizes:
+        docs = synthetic_docs(n)
+        legacy, per_doc, batch = throughput(docs, engine)
+        legacy_keys, legacy_bytes = per_ticker_memory(docs, legacy_engine)
+        keys, held = per_ticker_memory(docs, engine)
+        print(f"{n:>8} {legacy:>14,.0f} {per_doc:>15,.0f} {batch:>13,.0f} "
+              f"{legacy_keys:>15,} {legacy_bytes / 1024:>11,.0f} {keys:>8,} {held / 1024:>8,.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    run(parser.parse_args().sizes)
@@ -0,0 +1,34 @@
+"""
+Stub App - Runs app.py with every upstream answered by a benchmarks.stub_server.StubServer
+
+The launching benchmark passes the stub's URLs in SWARM_BENCH_STUB (JSON
+with base_url, rss_feeds and subreddits), so the server never touches the
+network. Collectors are still imported on first use, as in the real app.
+Usage:
+  SWARM_BENCH_STUB='{"base_url": ..., "rss_feeds": [...], "subreddits": [...]}' python -m benchmarks.stub_app
+"""
+import json
+import os
+import runpy
+import swarm_orchestrator
+from benchmarks import ROOT, use_stub_feeds
+
+STUB = json.loads(os.environ['SWARM_BENCH_STUB'])
+
+
+def reddit_collector():
+    from data_collectors.reddit_collector import RedditCollector
+    return RedditCollector(base_url=f"{STUB['base_url']}/r")
+
+
+def financial_collector():
+    from benchmarks.stub_server import fixture_downloader
+    from data_collectors.financial_collector import FinancialCollector
+    return FinancialCollector(downloader=fixture_downloader(f"{STUB['base_url']}/yfinance/yfinance_indices.json"))
+
+
+if __name__ == '__main__':
+    use_stub_feeds(STUB['rss_feeds'], STUB['subreddits'])
+    swarm_orchestrator.LAZY_COLLECTORS.update(reddit_collector=('benchmarks.stub_app', 'reddit_collector'),
+                                              financial_collector=('benchmarks.stub_app', 'financial_collector'))
+    runpy.run_path(os.path.join(ROOT, 'app.py'), run_name='__main__')
@@ -0,0 +1,121 @@
+"""
+Stub Server - Serves the recorded fixtures over local HTTP for offline benchmarks
+
+Routes:
+  /rss/<feed>.xml            benchmarks/fixtures/rss/<feed>.xml
+  /r/<subreddit>/hot.json    benchmarks/fixtures/reddit/<subreddit>.json
+  /r/<subreddit>/comments/<post>.json
+                             benchmarks/fixtures/reddit_comments/<subreddit>/<post>.json
+  /yfinance/<name>.json      benchmarks/fixtures/<name>.json
+"""
+import asyncio
+import os
+import threading
+from typing import Callable, List
+import pandas as pd
+import requests
+from aiohttp import web
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def fixture_downloader(url: str) -> Callable[[List[str], str], pd.DataFrame]:
+    """FinancialCollector downloader that fetches recorded history from the stub server"""
+    def download(symbols: List[str], period: str) -> pd.DataFrame:
+        history = requests.get(url, timeout=10).json()
+        columns = {(field, symbol): history['symbols'][symbol][field]
+                   for field in PRICE_FIELDS for symbol in symbols if symbol in history['symbols']}
+        return pd.DataFrame(columns, index=pd.to_datetime(history['dates']))
+    return download
+
+
+class StubServer:
+    """aiohttp server on 127.0.0.1 (ephemeral port) running in a daemon thread"""
+
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR, latency: float = 0.0):
+        self.fixtures_dir = fixtures_dir
+        # Artificial per-response delay to mimic a real upstream round-trip
+        self.latency = latency
+        self.port = None
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def rss_urls(self) -> List[str]:
+        feeds = sorted(os.listdir(os.path.join(self.fixtures_dir, 'rss')))
+        return [f"{self.base_url}/rss/{feed}" for feed in feeds]
+
+    def subreddits(self) -> List[str]:
+        return sorted(name[:-5] for name in os.listdir(os.path.join(self.fixtures_dir, 'reddit')))
+
+    async def _serve(self, path: str, content_type: str) -> web.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if not os.path.isfile(path):
+                raise web.HTTPNotFound()
+            with open(path, 'rb') as f:
+                return web.Response(body=f.read(), content_type=content_type)
+        finally:
+            self.in_flight -= 1
+
+    async def _rss(self, request: web.Request) -> web.Response:
+        return await self._serve(os.path.join(self.fixtures_dir, 'rss', request.match_info['feed']), 'application/rss+xml')
+
+    async def _reddit(self, request: web.Request) -> web.Response:
+        return await self._serve(os.path.join(self.fixtures_dir, 'reddit', f"{request.match_info['sub']}.json"),
+                                 'application/json')
+
+    async def _comments(self, request: web.Request) -> web.Response:
+        return await self._serve(os.path.join(self.fixtures_dir, 'reddit_comments', request.match_info['sub'],
+                                              f"{request.match_info['post']}.json"), 'application/json')
+
+    async def _yfinance(self, request: web.Request) -> web.Response:
+        return await self._serve(os.path.join(self.fixtures_dir, request.match_info['name']), 'application/json')
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get('/rss/{feed}', self._rss)
+        app.router.add_get('/r/{sub}/hot.json', self._reddit)
+        app.router.add_get('/r/{sub}/comments/{post}.json', self._comments)
+        app.router.add_get('/yfinance/{name}', self._yfinance)
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self) -> 'StubServer':
+        self._thread = threading.Thread(target=self._run, name='stub-server', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,222 @@
+"""
+Cache - Bounded TTL/LRU cache with negative entries and optional disk persistence
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, NamedTuple, Optional, Tuple
+import config
+from metrics import registry
+
+_MISSING = object()
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    stored_at: float  # wall-clock seconds, so persisted entries survive restarts
+    expires_at: Optional[float]  # None = never expires
+    negative: bool = False
+
+    def is_fresh(self, now: float) -> bool:
+        return self.expires_at is None or now < self.expires_at
+
+
+class DiskBackend:
+    """Write-through SQLite store so a restart does not cold-start every upstream"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, entry BLOB NOT NULL)')
+        self._conn.commit()
+
+    def load(self) -> Iterator[Tuple[Hashable, CacheEntry]]:
+        with self._lock:
+            rows = self._conn.execute('SELECT key, entry FROM cache').fetchall()
+        for key, entry in rows:
+            try:
+                yield pickle.loads(key), CacheEntry(*pickle.loads(entry))
+            except Exception as e:
+                print(f"Skipping unreadable cache entry in {self.path}: {e}")
+
+    def save(self, key: Hashable, entry: CacheEntry):
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO cache (key, entry) VALUES (?, ?)',
+                               (pickle.dumps(key), pickle.dumps(tuple(entry))))
+            self._conn.commit()
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache WHERE key = ?', (pickle.dumps(key),))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache')
+            self._conn.commit()
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-key TTLs.
+
+    Expired entries are not dropped on read: `get(..., allow_stale=True)`
+    still returns them so callers can serve stale data while refreshing.
+    They leave the cache through LRU eviction, `purge_expired()` or being
+    overwritten. Negative entries remember failed lookups for a short
+    time so a broken key is not retried on every refresh.
+    """
+
+    def __init__(self, max_size: int = 1024, default_ttl: Optional[float] = None,
+                 negative_ttl: float = 60, backend: DiskBackend = None):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Hashable, CacheEntry]' = OrderedDict()
+        self._lock = threading.RLock()
+
+        if backend is not None:
+            for key, entry in backend.load():
+                self._entries[key] = entry
+            self._evict()
+
+    def _expiry(self, ttl: Optional[float], now: float) -> Optional[float]:
+        ttl = self.default_ttl if ttl is None else ttl
+        return None if ttl is None else now + ttl
+
+    def _evict(self):
+        while len(self._entries) > self.max_size:
+            key, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            if self.backend is not None:
+                self.backend.delete(key)
+
+    def _store(self, key: Hashable, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if self.backend is not None:
+                self.backend.save(key, entry)
+            self._evict()
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """Raw entry lookup (fresh or not) without touching the counters"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def get(self, key: Hashable, default: Any = None, allow_stale: bool = False) -> Any:
+        """Value for `key` if present and fresh (or any age with allow_stale)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.negative or not (allow_stale or entry.is_fresh(time.time())):
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        now = time.time()
+        self._store(key, CacheEntry(value, now, self._expiry(ttl, now)))
+
+    def set_negative(self, key: Hashable, ttl: Optional[float] = None):
+        """Remember that looking up `key` failed"""
+        now = time.time()
+        ttl = self.negative_ttl if ttl is None else ttl
+        self._store(key, CacheEntry(None, now, now + ttl, negative=True))
+
+    def is_negative(self, key: Hashable) -> bool:
+        """True while a failed lookup for `key` is still being remembered"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.negative and entry.is_fresh(time.time()):
+                self.negative_hits += 1
+                return True
+            return False
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            if self._entries.pop(key, _MISSING) is not _MISSING and self.backend is not None:
+                self.backend.delete(key)
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if not entry.is_fresh(now)]
+            for key in expired:
+                self.delete(key)
+            return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.backend is not None:
+                self.backend.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not entry.negative and entry.is_fresh(time.time())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'negative_hits': self.negative_hits,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def create_cache(name: str, max_size: int = None, default_ttl: Optional[float] = None,
+                 persist: bool = None) -> TTLCache:
+    """Build a cache from CACHE_CONFIG, persisted under cache_dir when enabled (or forced by `persist`)"""
+    cache_config = config.CACHE_CONFIG
+    backend = None
+    if cache_config['persist'] if persist is None else persist:
+        backend = DiskBackend(os.path.join(cache_config['cache_dir'], f"{name}.sqlite3"))
+    cache = TTLCache(
+        max_size=max_size or cache_config['max_entries'],
+        default_ttl=default_ttl,
+        negative_ttl=cache_config['negative_ttl'],
+        backend=backend
+    )
+    _named_caches[name] = cache
+    return cache
+
+
+# Caches built by create_cache, by name, for the metrics endpoint
+_named_caches: 'weakref.WeakValueDictionary[str, TTLCache]' = weakref.WeakValueDictionary()
+
+
+def _cache_samples():
+    for name, cache in list(_named_caches.items()):
+        stats = cache.stats()
+        yield 'swarm_cache_hits_total', {'cache': name}, stats['hits']
+        yield 'swarm_cache_misses_total', {'cache': name}, stats['misses']
+        yield 'swarm_cache_evictions_total', {'cache': name}, stats['evictions']
+        yield 'swarm_cache_entries', {'cache': name}, stats['size']
+        yield 'swarm_cache_hit_ratio', {'cache': name}, stats['hit_ratio']
+
+
+registry.register_callback('caches', _cache_samples)
@@ -17,8 +17,11 @@ NEWS_SOURCES = {
     ],
     'reddit': {
         'subreddits': ['stocks', 'investing', 'StockMarket', 'wallstreetbets'],
-        'use_api': False  # Use web scraping instead of API
-    }
+        'use_api': False,  # Use web scraping instead of API
+        'rate_limit': 1,  # requests per second
+        'burst': 4
+    },
+    'rss_rate_limit': 2,  # requests per second, per feed host
 }
 
 # Free Financial Data APIs
@@ -35,17 +38,77 @@ FINANCIAL_APIS = {
 
 # Swarm Configuration
 SWARM_CONFIG = {
-    'workers': 5,  # Number of parallel workers
+    'workers': int(os.getenv('SWARM_WORKERS', os.cpu_count() or 1)),  # Scoring processes for backfills
     'update_interval': 300,  # Update every 5 minutes
     'max_articles': 100,  # Max articles per update
     'cache_duration': 600  # Cache for 10 minutes
 }
 
+# Collection schedule per source (data_collectors/sources.py): how often it is
+# fetched, how many of its requests run at once and how many seconds a refresh
+# waits before serving the previous items of unfinished targets
+SOURCES_CONFIG = {
+    'rss': {'interval': 300, 'concurrency': 4, 'deadline': 20},
+    'reddit': {'interval': 300, 'concurrency': 4, 'deadline': 20},
+    # Comment trees of the `posts` most discussed posts, read within depth/size limits
+    'reddit_comments': {
+        'enabled': os.getenv('SWARM_REDDIT_COMMENTS', '0') == '1',
+        'interval': 600, 'concurrency': 2, 'deadline': 45,
+        'posts': 10, 'max_depth': 4, 'max_comments': 200, 'max_bytes': 2 * 2**20
+    },
+    'financial': {'interval': 30, 'concurrency': 1, 'deadline': 10}
+}
+
+# Cache Configuration
+CACHE_CONFIG = {
+    'max_entries': 1024,  # LRU bound per cache
+    'negative_ttl': 120,  # Remember failed lookups (e.g. delisted symbols) for 2 minutes
+    'persist': os.getenv('SWARM_CACHE_PERSIST', '1') == '1',  # Keep caches on disk across restarts
+    'cache_dir': os.getenv('SWARM_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.swarm_cache'))
+}
+
+# Article Storage (SQLite, deduplicated by normalized URL/title)
+STORAGE_CONFIG = {
+    'enabled': os.getenv('SWARM_STORAGE_ENABLED', '1') == '1',
+    'article_db': os.getenv('SWARM_ARTICLE_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.swarm_data', 'articles.sqlite3')),
+    'retention_days': 30
+}
+
+# Rolling sentiment series: resolution -> (bucket seconds, buckets kept)
+SERIES_CONFIG = {
+    'resolutions': {
+        '1m': (60, 24 * 60),  # last 24 hours
+        '5m': (300, 7 * 24 * 12),  # last 7 days
+        '1h': (3600, 30 * 24)  # last 30 days
+    }
+}
+
+# Known symbols for ticker extraction (one per line, # comments allowed)
+TICKER_CONFIG = {
+    'universe_file': os.getenv('SWARM_TICKER_UNIVERSE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'tickers.txt'))
+}
+
+# Shared HTTP client (aiohttp) settings
+HTTP_CONFIG = {
+    'max_connections': 20,  # Pool size across all hosts
+    'per_host_limit': 4,  # Concurrent connections per host
+    'timeout': 15,  # Total seconds per request
+    'user_agent': 'MarketIntelligenceSwarm/1.0 (Educational)'
+}
+
+# Intelligence delta push (/api/intelligence/stream)
+STREAM_CONFIG = {
+    'queue_size': 16,  # Deltas buffered per client before a lagging client is disconnected
+    'history': 64,  # Recent deltas replayed to clients reconnecting with Last-Event-ID
+    'keepalive': 15,  # Seconds between keepalive comments on an idle stream
+    'max_subscribers': int(os.getenv('SWARM_STREAM_MAX_SUBSCRIBERS', 1000))
+}
+
 # Server Configuration
 SERVER_CONFIG = {
-    'host': '0.0.0.0',
-    'port': 5000,
-    'debug': True
+    'host': os.getenv('SWARM_HOST', '0.0.0.0'),
+    'port': int(os.getenv('SWARM_PORT', 5000)),
+    'debug': os.getenv('SWARM_DEBUG', '1') == '1'
 }
 
 
@@ -2,77 +2,138 @@
 Financial Data Collector - Free market data
 """
 import yfinance as yf
-from typing import Dict, List
+import requests
+from typing import Callable, Dict, List
 import pandas as pd
 from datetime import datetime, timedelta
+from cache import create_cache
+from metrics import registry
+
+# Downloader signature: (symbols, period) -> DataFrame with (field, symbol) columns
+Downloader = Callable[[List[str], str], pd.DataFrame]
+
+# Index symbols and the display names Yahoo's .info reports as longName
+MARKET_INDICES = {
+    '^GSPC': 'S&P 500',
+    '^DJI': 'Dow Jones Industrial Average',
+    '^IXIC': 'NASDAQ Composite',
+    '^RUT': 'Russell 2000'
+}
 
 class FinancialCollector:
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, downloader: Downloader = None):
         self.cache_duration = 300  # 5 minutes
+        self.cache = create_cache('financial', default_ttl=self.cache_duration)
+        # One pooled HTTP session for every Yahoo request
+        self.session = requests.Session()
+        self.downloader = downloader or self._yf_download
     
     def get_stock_data(self, symbol: str) -> Dict:
         """Get stock data for a symbol"""
-        cache_key = f"stock_{symbol}"
-        if cache_key in self.cache:
-            cached_data, cached_time = self.cache[cache_key]
-            if (datetime.now() - cached_time).seconds < self.cache_duration:
-                return cached_data
+        quotes = self.get_quotes([symbol], include_info=True)
+        return quotes[0] if quotes else {}
         
-        try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            
-            # Get recent price data
-            hist = ticker.history(period="5d")
-            
-            if hist.empty:
-                return {}
-            
-            latest = hist.iloc[-1]
-            previous = hist.iloc[-2] if len(hist) > 1 else latest
-            
-            change = latest['Close'] - previous['Close']
-            change_percent = (change / previous['Close'] * 100) if previous['Close'] > 0 else 0
+    def _yf_download(self, symbols: List[str], period: str) -> pd.DataFrame:
+        """Fetch price history for all symbols in one batched Yahoo request"""
+        return yf.download(symbols, period=period, group_by='column', threads=True,
+                           progress=False, session=self.session)
+    
+    @staticmethod
+    def compute_quotes(frame: pd.DataFrame, symbols: List[str]) -> pd.DataFrame:
+        """Vectorized latest price / change / volume for every symbol in a history frame"""
+        if frame is None or frame.empty:
+            return pd.DataFrame(columns=['price', 'change', 'change_percent', 'volume'])
+        if not isinstance(frame.columns, pd.MultiIndex):
+            # Single-symbol downloads come back with flat columns
+            frame = pd.concat({symbols[0]: frame}, axis=1).swaplevel(axis=1)
+        
+        close = frame['Close']
+        volume = frame['Volume'].reindex(columns=close.columns)
+        valid = close.notna()
+        # 1 on each symbol's latest traded row, 2 on the one before, ...
+        rank_from_end = valid.iloc[::-1].cumsum().iloc[::-1].where(valid)
+        
+        latest = close.where(rank_from_end == 1).max()
+        previous = close.where(rank_from_end == 2).max().fillna(latest)
+        change = latest - previous
+        change_percent = (change / previous * 100).where(previous > 0, 0.0)
+        
+        quotes = pd.DataFrame({
+            'price': latest,
+            'change': change,
+            'change_percent': change_percent.round(2),
+            'volume': volume.where(rank_from_end == 1).max().fillna(0)
+        })
+        return quotes.dropna(subset=['price'])
+    
+    def get_quotes(self, symbols: List[str], include_info: bool = False, refresh: bool = False) -> List[Dict]:
+        """Get quotes for many symbols with one batched download.
+
+        The slow per-symbol `.info` lookup (name, market cap, sector) is only
+        made when include_info is set. With `refresh` cached quotes are
+        downloaded again (the results still update the cache).
+        """
+        results = {}
+        missing = []
+        for symbol in symbols:
+            cached = None if refresh else self.cache.get(f"quote_{symbol}_{include_info}")
+            if cached:
+                results[symbol] = cached
+            elif not self.cache.is_negative(f"quote_{symbol}"):
+                missing.append(symbol)
+        
+        if missing:
+            try:
+                with registry.timer('swarm_fetch_seconds', source='yfinance', target='quotes'):
+                    quotes = self.compute_quotes(self.downloader(missing, "5d"), missing)
+            except Exception as e:
+                registry.inc('swarm_fetch_errors_total', source='yfinance', target='quotes')
+                print(f"Error fetching batched quotes for {missing}: {e}")
+                return [results[symbol] for symbol in symbols if symbol in results]
+            registry.inc('swarm_items_fetched_total', len(quotes), source='yfinance', target='quotes')
             
-            data = {
-                'symbol': symbol,
-                'name': info.get('longName', symbol),
-                'price': float(latest['Close']),
-                'change': float(change),
-                'change_percent': round(change_percent, 2),
-                'volume': int(latest['Volume']),
-                'market_cap': info.get('marketCap', 0),
-                'sector': info.get('sector', ''),
-                'industry': info.get('industry', ''),
-                'timestamp': datetime.now().isoformat()
-            }
+            # Symbols Yahoo had no data for (delisted, typos) are not retried for a while
+            for symbol in set(missing) - set(quotes.index):
+                self.cache.set_negative(f"quote_{symbol}")
             
-            self.cache[cache_key] = (data, datetime.now())
-            return data
+            timestamp = datetime.now().isoformat()
+            for symbol, row in quotes.iterrows():
+                info = self._get_info(symbol) if include_info else {}
+                data = {
+                    'symbol': symbol,
+                    'name': info.get('longName', symbol),
+                    'price': float(row['price']),
+                    'change': float(row['change']),
+                    'change_percent': float(row['change_percent']),
+                    'volume': int(row['volume']),
+                    'market_cap': info.get('marketCap', 0),
+                    'sector': info.get('sector', ''),
+                    'industry': info.get('industry', ''),
+                    'timestamp': timestamp
+                }
+                self.cache.set(f"quote_{symbol}_{include_info}", data)
+                results[symbol] = data
+        
+        return [results[symbol] for symbol in symbols if symbol in results]
+    
+    def _get_info(self, symbol: str) -> Dict:
+        try:
+            return yf.Ticker(symbol, session=self.session).info or {}
         except Exception as e:
-            print(f"Error fetching stock data for {symbol}: {e}")
+            print(f"Error fetching info for {symbol}: {e}")
             return {}
     
-    def get_market_indices(self) -> List[Dict]:
-        """Get major market indices"""
-        indices = ['^GSPC', '^DJI', '^IXIC', '^RUT']  # S&P 500, Dow, Nasdaq, Russell 2000
-        results = []
-        
-        for symbol in indices:
-            data = self.get_stock_data(symbol)
-            if data:
-                results.append(data)
-        
-        return results
+    def get_market_indices(self, refresh: bool = False) -> List[Dict]:
+        """Get major market indices (`refresh` skips the quote cache)
+
+        Names come from MARKET_INDICES rather than a per-index `.info` call;
+        indices have no market cap or sector to look up.
+        """
+        quotes = self.get_quotes(list(MARKET_INDICES), refresh=refresh)
+        return [dict(quote, name=MARKET_INDICES[quote['symbol']]) for quote in quotes]
     
     def get_trending_stocks(self, symbols: List[str]) -> List[Dict]:
         """Get data for multiple stocks"""
-        results = []
-        for symbol in symbols[:20]:  # Limit to 20 stocks
-            data = self.get_stock_data(symbol)
-            if data:
-                results.append(data)
-        return results
+        return self.get_quotes(symbols[:20])  # Limit to 20 stocks
 
 
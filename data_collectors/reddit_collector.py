@@ -2,18 +2,27 @@
 Reddit Collector - Free social sentiment data
 Uses web scraping (no API key required)
 """
+import asyncio
+import json
 import requests
-from bs4 import BeautifulSoup
 from typing import List, Dict
 import time
 import re
+import config
+from data_collectors.rate_limiter import TokenBucket
+from data_collectors.reddit_comments import CommentLimits, stream_comments
+from metrics import registry
+
+_POST_ID = re.compile(r'/comments/([A-Za-z0-9]+)')
 
 class RedditCollector:
-    def __init__(self):
-        self.base_url = "https://www.reddit.com/r"
+    def __init__(self, base_url: str = "https://www.reddit.com/r"):
+        self.base_url = base_url
         self.headers = {
             'User-Agent': 'MarketIntelligenceSwarm/1.0 (Educational)'
         }
+        reddit_config = config.NEWS_SOURCES['reddit']
+        self.rate_limiter = TokenBucket(reddit_config['rate_limit'], reddit_config['burst'])
     
     def fetch_subreddit(self, subreddit: str, limit: int = 25) -> List[Dict]:
         """Fetch posts from a subreddit"""
@@ -24,28 +33,108 @@ class RedditCollector:
             if response.status_code != 200:
                 return []
             
-            data = response.json()
-            posts = []
-            
-            for child in data.get('data', {}).get('children', [])[:limit]:
-                post_data = child.get('data', {})
-                post = {
-                    'title': post_data.get('title', ''),
-                    'url': post_data.get('url', ''),
-                    'selftext': post_data.get('selftext', ''),
-                    'score': post_data.get('score', 0),
-                    'num_comments': post_data.get('num_comments', 0),
-                    'created_utc': post_data.get('created_utc', 0),
-                    'subreddit': subreddit,
-                    'source_type': 'reddit',
-                    'permalink': f"https://reddit.com{post_data.get('permalink', '')}"
-                }
-                posts.append(post)
-            
-            return posts
+            return self._parse_listing(response.json(), subreddit, limit)
         except Exception as e:
             print(f"Error fetching Reddit data from r/{subreddit}: {e}")
             return []
+
+    async def fetch_subreddit_async(self, session, subreddit: str, limit: int = 25,
+                                    strict: bool = False) -> List[Dict]:
+        """Fetch posts from a subreddit over the shared aiohttp session
+
+        Failures are logged and return [] unless `strict` is set, in which
+        case they are raised so the caller can keep the subreddit's previous posts.
+        """
+        with registry.timer('swarm_fetch_seconds', source='reddit', target=subreddit):
+            try:
+                posts = await self._fetch_subreddit_async(session, subreddit, limit)
+            except Exception as e:
+                registry.inc('swarm_fetch_errors_total', source='reddit', target=subreddit)
+                print(f"Error fetching Reddit data from r/{subreddit}: {e}")
+                if strict:
+                    raise
+                return []
+        registry.inc('swarm_items_fetched_total', len(posts), source='reddit', target=subreddit)
+        return posts
+
+    async def _fetch_subreddit_async(self, session, subreddit: str, limit: int) -> List[Dict]:
+        url = f"{self.base_url}/{subreddit}/hot.json?limit={limit}"
+        await self.rate_limiter.acquire()
+        async with session.get(url, headers=self.headers) as response:
+            response.raise_for_status()
+            if response.status != 200:
+                return []
+            body = await response.read()
+
+        registry.inc('swarm_bytes_fetched_total', len(body), source='reddit', target=subreddit)
+        return self._parse_listing(json.loads(body), subreddit, limit)
+
+    def _parse_listing(self, data: Dict, subreddit: str, limit: int) -> List[Dict]:
+        """Convert a hot.json listing into post dicts"""
+        posts = []
+        for child in data.get('data', {}).get('children', [])[:limit]:
+            post_data = child.get('data', {})
+            post = {
+                'title': post_data.get('title', ''),
+                'url': post_data.get('url', ''),
+                'selftext': post_data.get('selftext', ''),
+                'score': post_data.get('score', 0),
+                'num_comments': post_data.get('num_comments', 0),
+                'created_utc': post_data.get('created_utc', 0),
+                'published_ts': int(post_data.get('created_utc') or 0),
+                'subreddit': subreddit,
+                'source_type': 'reddit',
+                'permalink': f"https://reddit.com{post_data.get('permalink', '')}"
+            }
+            posts.append(post)
+
+        return posts
+
+    async def fetch_comments_async(self, session, post: Dict, limits: CommentLimits = CommentLimits(),
+                                   strict: bool = False) -> List[Dict]:
+        """Comments of one post, as Reddit documents, within `limits`
+
+        Shares the listing rate limiter, so comment crawls never push the
+        collector past config.NEWS_SOURCES['reddit']['rate_limit'].
+        """
+        subreddit = post.get('subreddit', '')
+        with registry.timer('swarm_fetch_seconds', source='reddit_comments', target=subreddit):
+            try:
+                result = await self._fetch_comments_async(session, post, limits)
+            except Exception as e:
+                registry.inc('swarm_fetch_errors_total', source='reddit_comments', target=subreddit)
+                print(f"Error fetching Reddit comments for {post.get('permalink', '')}: {e}")
+                if strict:
+                    raise
+                return []
+        registry.inc('swarm_bytes_fetched_total', result['bytes'], source='reddit_comments', target=subreddit)
+        registry.inc('swarm_items_fetched_total', len(result['comments']), source='reddit_comments', target=subreddit)
+        if result['truncated']:
+            registry.inc('swarm_comment_threads_truncated_total', subreddit=subreddit)
+        return result['comments']
+
+    async def _fetch_comments_async(self, session, post: Dict, limits: CommentLimits) -> Dict:
+        match = _POST_ID.search(post.get('permalink', ''))
+        if not match:
+            raise ValueError(f"No post id in permalink {post.get('permalink')!r}")
+        # Reddit trims the tree server-side too; depth counts the top level as 1
+        url = (f"{self.base_url}/{post.get('subreddit', '')}/comments/{match.group(1)}.json"
+               f"?limit={limits.max_comments}&depth={limits.max_depth + 1}&sort=top&raw_json=1")
+        await self.rate_limiter.acquire()
+        async with session.get(url, headers=self.headers) as response:
+            response.raise_for_status()
+            return await stream_comments(response.content, post, limits)
+
+    async def collect_all_async(self, session, subreddits: List[str]) -> List[Dict]:
+        """Collect from all subreddits concurrently over one session"""
+        results = await asyncio.gather(*(self.fetch_subreddit_async(session, s) for s in subreddits))
+        return self.sort_posts([post for posts in results for post in posts])
+
+    @staticmethod
+    def sort_posts(posts: List[Dict]) -> List[Dict]:
+        """Sort by score (highest first)"""
+        posts.sort(key=lambda x: x['score'], reverse=True)
+        return posts
     
     def collect_all(self, subreddits: List[str]) -> List[Dict]:
         """Collect from all subreddits"""
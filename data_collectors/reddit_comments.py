@@ -0,0 +1,152 @@
+"""
+Reddit Comments - Comment trees from /comments/<id>.json read as a stream, within depth and size limits
+"""
+import json
+from typing import Dict, List, NamedTuple
+
+try:
+    import ijson
+except ImportError:  # in requirements.txt; without it the (size-capped) body is loaded whole
+    ijson = None
+
+# Fields read from each comment's `data`; everything else in the thread is skipped
+COMMENT_FIELDS = frozenset(('kind', 'data.id', 'data.body', 'data.score', 'data.created_utc', 'data.permalink'))
+REMOVED_BODIES = ('[deleted]', '[removed]')
+# ijson decodes a whole read buffer into events at once, so this bounds the
+# parser's memory (~400 KiB at 8 KiB) whatever the size of the thread
+STREAM_BUFFER = 8192
+
+
+class CommentLimits(NamedTuple):
+    max_depth: int = 4  # deepest reply level kept; top-level comments are depth 0
+    max_comments: int = 200  # per thread
+    max_bytes: int = 2 * 2**20  # response bytes read per thread
+    max_chars: int = 2000  # characters kept of each comment body
+
+
+class CommentThreadTooLarge(ValueError):
+    pass
+
+
+def comment_document(fields: Dict, depth: int, post: Dict, limits: CommentLimits) -> Dict:
+    """A comment shaped like a Reddit post document, so it is scored the same way"""
+    created = int(fields.get('data.created_utc') or 0)  # ijson yields Decimal
+    permalink = fields.get('data.permalink')
+    return {
+        'title': '',
+        'selftext': fields['data.body'][:limits.max_chars],
+        'score': int(fields.get('data.score') or 0),
+        'created_utc': created,
+        'published_ts': created,
+        'subreddit': post.get('subreddit', ''),
+        'source_type': 'comments',
+        'permalink': f"https://reddit.com{permalink}" if permalink else f"{post.get('permalink', '')}{fields.get('data.id')}/",
+        'post_permalink': post.get('permalink', ''),
+        'depth': depth
+    }
+
+
+def _is_comment(fields: Dict) -> bool:
+    return fields.get('kind') == 't1' and bool(fields.get('data.body')) and fields['data.body'] not in REMOVED_BODIES
+
+
+def parse_comments(thread: List[Dict], post: Dict, limits: CommentLimits = CommentLimits()) -> List[Dict]:
+    """Comments of an already decoded thread ([post listing, comment listing])
+
+    Replies come before their parent, in the order a streaming read finishes
+    them, so both readers return the same comments when max_comments cuts
+    a thread short. `more` stubs (collapsed replies) are not followed.
+    """
+    comments = []
+
+    def visit(child: Dict, depth: int):
+        if depth > limits.max_depth or len(comments) >= limits.max_comments:
+            return
+        data = child.get('data') or {}
+        replies = data.get('replies')
+        if isinstance(replies, dict):
+            for reply in (replies.get('data') or {}).get('children', []):
+                visit(reply, depth + 1)
+        if len(comments) >= limits.max_comments:
+            return
+        fields = {'kind': child.get('kind')}
+        fields.update((f"data.{key}", data.get(key)) for key in ('id', 'body', 'score', 'created_utc', 'permalink'))
+        if _is_comment(fields):
+            comments.append(comment_document(fields, depth, post, limits))
+
+    for listing in thread if isinstance(thread, list) else [thread]:
+        for child in (listing.get('data') or {}).get('children', []):
+            visit(child, 0)
+    return comments
+
+
+class _CappedReader:
+    """Async reader that reports end-of-stream once `max_bytes` have been read"""
+
+    def __init__(self, content, max_bytes: int):
+        self.content = content
+        self.remaining = max_bytes
+        self.bytes_read = 0
+        self.truncated = False
+
+    async def read(self, n: int = -1) -> bytes:
+        if n == 0:
+            return b''  # ijson probes with read(0) for bytes vs str
+        if self.remaining <= 0:
+            self.truncated = not self.content.at_eof()
+            return b''
+        chunk = await self.content.read(min(n, self.remaining) if n > 0 else self.remaining)
+        self.remaining -= len(chunk)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+async def stream_comments(content, post: Dict, limits: CommentLimits = CommentLimits()) -> Dict:
+    """Read comments off an aiohttp response body without decoding the whole thread
+
+    Returns {'comments', 'bytes', 'truncated'}. With ijson, only the fields
+    in COMMENT_FIELDS of comments within max_depth are ever materialised,
+    and a thread over max_bytes keeps the comments read before the cap.
+    Without it the body is read up to max_bytes and decoded in one go.
+    """
+    reader = _CappedReader(content, limits.max_bytes)
+    if ijson is None:
+        chunks = []
+        while True:
+            chunk = await reader.read(STREAM_BUFFER)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        if reader.truncated:
+            raise CommentThreadTooLarge(f"thread exceeds {limits.max_bytes} bytes (install ijson to read part of it)")
+        comments = parse_comments(json.loads(b''.join(chunks)), post, limits)
+        return {'comments': comments, 'bytes': reader.bytes_read, 'truncated': len(comments) >= limits.max_comments}
+
+    comments = []
+    # One entry per open child object: its prefix, reply depth and the fields
+    # read so far (None when it is deeper than max_depth and skipped)
+    stack = []
+    fields, field_start = None, 0  # the innermost open child's
+    truncated = False
+    try:
+        async for prefix, event, value in ijson.parse_async(reader, buf_size=STREAM_BUFFER):
+            if event == 'string' or event == 'number':
+                if fields is not None and prefix[field_start:] in COMMENT_FIELDS:
+                    fields[prefix[field_start:]] = value
+            elif event == 'start_map':
+                if prefix.endswith('children.item'):
+                    depth = prefix.count('.replies.')
+                    fields, field_start = ({} if depth <= limits.max_depth else None), len(prefix) + 1
+                    stack.append((prefix, depth, fields))
+            elif event == 'end_map' and stack and prefix == stack[-1][0]:
+                _, depth, done = stack.pop()
+                fields, field_start = (stack[-1][2], len(stack[-1][0]) + 1) if stack else (None, 0)
+                if done is not None and _is_comment(done):
+                    comments.append(comment_document(done, depth, post, limits))
+                    if len(comments) >= limits.max_comments:
+                        truncated = True
+                        break
+    except ijson.IncompleteJSONError:
+        if not reader.truncated:
+            raise
+    return {'comments': comments, 'bytes': reader.bytes_read, 'truncated': truncated or reader.truncated}
@@ -1,51 +1,196 @@
 """
 RSS Feed Collector - Free news aggregation
 """
+import asyncio
+import calendar
+import hashlib
 import feedparser
 import requests
-from datetime import datetime
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Dict, Optional
 import time
+import config
+from article_store import document_timestamp
+from cache import create_cache
+from data_collectors.rate_limiter import HostRateLimiter
+from metrics import registry
 
 class RSSCollector:
     def __init__(self):
         self.user_agent = 'MarketIntelligenceSwarm/1.0'
+        self.rate_limiter = HostRateLimiter(config.NEWS_SOURCES['rss_rate_limit'])
+        # Per-feed validators (ETag, Last-Modified, body hash) plus the articles
+        # parsed from that body, persisted so a 304 can be answered after a restart
+        self.feed_state = create_cache('rss_feeds', max_size=256)
+        self.feed_metrics: Dict[str, Dict[str, float]] = {}
+        # feedparser has no timeout of its own; parsing on a long-lived thread
+        # keeps the event loop (and the scheduler's deadlines) responsive
+        # without starting a new thread on every refresh
+        self._parser = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rss-parse')
+    
+    def _metrics(self, url: str) -> Dict[str, float]:
+        if url not in self.feed_metrics:
+            self.feed_metrics[url] = {
+                'requests': 0, 'not_modified': 0, 'unchanged_body': 0, 'parsed': 0,
+                'bytes_fetched': 0, 'bytes_saved': 0,
+                'parse_seconds': 0.0, 'parse_seconds_saved': 0.0
+            }
+        return self.feed_metrics[url]
+    
+    def _conditional_headers(self, state: Optional[Dict]) -> Dict[str, str]:
+        headers = {'User-Agent': self.user_agent}
+        if state:
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+        return headers
+    
+    def _reuse(self, url: str, state: Dict, not_modified: bool) -> List[Dict]:
+        """Serve the previously parsed articles and record what was saved"""
+        metrics = self._metrics(url)
+        metrics['not_modified' if not_modified else 'unchanged_body'] += 1
+        if not_modified:
+            metrics['bytes_saved'] += state['size']
+        metrics['parse_seconds_saved'] += state['parse_seconds']
+        return state['articles']
+    
+    def _parse_and_remember(self, url: str, body: bytes, etag: str = None, last_modified: str = None) -> List[Dict]:
+        start = time.perf_counter()
+        articles = self._parse_entries(feedparser.parse(body), url)
+        parse_seconds = time.perf_counter() - start
+        
+        metrics = self._metrics(url)
+        metrics['parsed'] += 1
+        metrics['parse_seconds'] += parse_seconds
+        self.feed_state.set(url, {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': hashlib.sha1(body).hexdigest(),
+            'size': len(body),
+            'parse_seconds': parse_seconds,
+            'articles': articles
+        })
+        return articles
     
     def fetch_feed(self, url: str) -> List[Dict]:
         """Fetch and parse RSS feed"""
         try:
-            headers = {'User-Agent': self.user_agent}
-            feed = feedparser.parse(url)
-            
-            articles = []
-            for entry in feed.entries[:20]:  # Limit to 20 per feed
-                article = {
-                    'title': entry.get('title', ''),
-                    'link': entry.get('link', ''),
-                    'summary': entry.get('summary', entry.get('description', '')),
-                    'published': self._parse_date(entry.get('published', '')),
-                    'source': feed.feed.get('title', url),
-                    'source_type': 'rss'
-                }
-                articles.append(article)
+            state = self.feed_state.get(url)
+            headers = self._conditional_headers(state)
+            response = requests.get(url, headers=headers, timeout=config.HTTP_CONFIG['timeout'])
+            self._metrics(url)['requests'] += 1
+            if response.status_code == 304 and state:
+                return self._reuse(url, state, not_modified=True)
+            if response.status_code != 200:
+                return []
             
-            return articles
+            body = response.content
+            self._metrics(url)['bytes_fetched'] += len(body)
+            etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+            if state and state['content_hash'] == hashlib.sha1(body).hexdigest():
+                self.feed_state.set(url, dict(state, etag=etag, last_modified=last_modified))
+                return self._reuse(url, state, not_modified=False)
+            return self._parse_and_remember(url, body, etag, last_modified)
         except Exception as e:
             print(f"Error fetching RSS feed {url}: {e}")
             return []
+
+    async def fetch_feed_async(self, session, url: str, strict: bool = False) -> List[Dict]:
+        """Fetch an RSS feed over the shared aiohttp session, skipping work when it has not changed
+
+        Failures are logged and return [] unless `strict` is set, in which
+        case they are raised so the caller can keep the feed's previous articles.
+        """
+        with registry.timer('swarm_fetch_seconds', source='rss', target=url):
+            try:
+                articles = await self._fetch_feed_async(session, url)
+            except Exception as e:
+                registry.inc('swarm_fetch_errors_total', source='rss', target=url)
+                print(f"Error fetching RSS feed {url}: {e}")
+                if strict:
+                    raise
+                return []
+        registry.inc('swarm_items_fetched_total', len(articles), source='rss', target=url)
+        return articles
+
+    async def _fetch_feed_async(self, session, url: str) -> List[Dict]:
+        state = self.feed_state.get(url)
+        await self.rate_limiter.acquire(url)
+        async with session.get(url, headers=self._conditional_headers(state)) as response:
+            self._metrics(url)['requests'] += 1
+            if response.status == 304 and state:
+                return self._reuse(url, state, not_modified=True)
+            response.raise_for_status()
+            if response.status != 200:
+                return []
+            body = await response.read()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            
+        self._metrics(url)['bytes_fetched'] += len(body)
+        registry.inc('swarm_bytes_fetched_total', len(body), source='rss', target=url)
+        if state and state['content_hash'] == hashlib.sha1(body).hexdigest():
+            self.feed_state.set(url, dict(state, etag=etag, last_modified=last_modified))
+            return self._reuse(url, state, not_modified=False)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._parser, self._parse_and_remember, url, body, etag, last_modified)
+
+    def metric_samples(self):
+        """feed_metrics as metrics samples, one series per feed and event"""
+        for url, metrics in list(self.feed_metrics.items()):
+            for event in ('requests', 'not_modified', 'unchanged_body', 'parsed'):
+                yield 'swarm_rss_feed_events_total', {'feed': url, 'event': event}, metrics[event]
+            yield 'swarm_bytes_saved_total', {'source': 'rss', 'target': url}, metrics['bytes_saved']
+            yield 'swarm_rss_parse_seconds_total', {'feed': url, 'kind': 'spent'}, metrics['parse_seconds']
+            yield 'swarm_rss_parse_seconds_total', {'feed': url, 'kind': 'saved'}, metrics['parse_seconds_saved']
+
+    def _parse_entries(self, feed, url: str) -> List[Dict]:
+        """Convert parsed feed entries into article dicts"""
+        articles = []
+        for entry in feed.entries[:20]:  # Limit to 20 per feed
+            published_ts = self._parse_timestamp(entry)
+            article = {
+                'title': entry.get('title', ''),
+                'link': entry.get('link', ''),
+                'summary': entry.get('summary', entry.get('description', '')),
+                'published': datetime.fromtimestamp(published_ts, timezone.utc).isoformat() if published_ts else '',
+                'published_ts': published_ts,
+                'source': feed.feed.get('title', url),
+                'source_type': 'rss'
+            }
+            articles.append(article)
+
+        return articles
     
-    def _parse_date(self, date_str: str) -> str:
-        """Parse date string to ISO format"""
+    @staticmethod
+    def _parse_timestamp(entry) -> int:
+        """Publication time in UTC epoch seconds, 0 when the entry has no usable date
+
+        Undated entries used to get the current time, which ranked them above
+        every real story; 0 keeps them at the bottom.
+        """
+        # feedparser normalizes dates to UTC struct_time, applying any offset
+        parsed = entry.get('published_parsed') or entry.get('updated_parsed')
         try:
-            if date_str:
-                # Try to parse with feedparser
-                parsed = feedparser._parse_date(date_str)
-                if parsed:
-                    return datetime(*parsed[:6]).isoformat()
-        except:
-            pass
-        return datetime.now().isoformat()
+            if not parsed and (entry.get('published') or entry.get('updated')):
+                parsed = feedparser._parse_date(entry.get('published') or entry.get('updated'))
+            return max(calendar.timegm(parsed), 0) if parsed else 0
+        except (TypeError, ValueError, OverflowError):
+            return 0
     
+    async def collect_all_async(self, session, feed_urls: List[str]) -> List[Dict]:
+        """Collect from all RSS feeds concurrently over one session"""
+        results = await asyncio.gather(*(self.fetch_feed_async(session, url) for url in feed_urls))
+        return self.sort_articles([article for articles in results for article in articles])
+
+    @staticmethod
+    def sort_articles(articles: List[Dict]) -> List[Dict]:
+        """Sort by date (newest first, undated last)"""
+        articles.sort(key=document_timestamp, reverse=True)
+        return articles
+
     def collect_all(self, feed_urls: List[str]) -> List[Dict]:
         """Collect from all RSS feeds"""
         all_articles = []
@@ -54,8 +199,6 @@ class RSSCollector:
             all_articles.extend(articles)
             time.sleep(1)  # Rate limiting
         
-        # Sort by date (newest first)
-        all_articles.sort(key=lambda x: x['published'], reverse=True)
-        return all_articles
+        return self.sort_articles(all_articles)
 
 
@@ -0,0 +1,21 @@
+"""
+Shared HTTP session - One pooled aiohttp session per intelligence run
+"""
+import aiohttp
+import config
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Create a ClientSession with connection pooling and per-host limits"""
+    http_config = config.HTTP_CONFIG
+    connector = aiohttp.TCPConnector(
+        limit=http_config['max_connections'],
+        limit_per_host=http_config['per_host_limit'],
+        ttl_dns_cache=300
+    )
+    timeout = aiohttp.ClientTimeout(total=http_config['timeout'])
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={'User-Agent': http_config['user_agent']}
+    )
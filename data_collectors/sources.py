@@ -0,0 +1,151 @@
+"""
+Sources - Pluggable upstreams collected by the SourceScheduler
+
+A source lists its targets (feeds, subreddits, quote batches) and fetches
+one target at a time. New sources subclass `Source`, register with
+`@register_source('name')` and get an entry in config.SOURCES_CONFIG.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+from data_collectors import reddit_comments
+from data_collectors.reddit_comments import CommentLimits
+import config
+
+# Where a source's items go: news, Reddit and comment windows are scored,
+# financial items are passed through as market indices
+KINDS = ('rss', 'reddit', 'comments', 'financial')
+
+SOURCE_TYPES: Dict[str, Callable[..., 'Source']] = {}
+
+
+def register_source(name: str):
+    """Class decorator making a Source available to config.SOURCES_CONFIG as `name`"""
+    def decorator(cls):
+        SOURCE_TYPES[name] = cls
+        return cls
+    return decorator
+
+
+class Source:
+    """One upstream refreshed on its own schedule.
+
+    `interval` is how often the scheduler fetches it, `concurrency` how many
+    of its targets are in flight at once and `deadline` how long a refresh
+    waits before serving the previous results of unfinished targets.
+    """
+    kind = 'rss'
+    # Kinds whose items this source reads in targets(); it runs after the sources producing them
+    after = ()
+
+    def __init__(self, owner, name: str, interval: float, concurrency: int = 4, deadline: float = 20):
+        if self.kind not in KINDS:
+            raise ValueError(f"Source {name!r} has unknown kind {self.kind!r}; expected one of {', '.join(KINDS)}")
+        # The SwarmOrchestrator, for access to its (lazily built) collectors
+        self.owner = owner
+        self.name = name
+        self.interval = interval
+        self.concurrency = concurrency
+        self.deadline = deadline
+
+    def targets(self) -> List[str]:
+        raise NotImplementedError
+
+    async def fetch(self, session, target: str) -> List[Dict]:
+        """Items for one target; raise on failure so its previous items are kept"""
+        raise NotImplementedError
+
+    def sort_items(self, items: List[Dict]) -> List[Dict]:
+        return items
+
+
+@register_source('rss')
+class RSSSource(Source):
+    kind = 'rss'
+
+    def targets(self) -> List[str]:
+        return list(config.NEWS_SOURCES['rss_feeds'])
+
+    async def fetch(self, session, target: str) -> List[Dict]:
+        return await self.owner.rss_collector.fetch_feed_async(session, target, strict=True)
+
+    def sort_items(self, items: List[Dict]) -> List[Dict]:
+        return self.owner.rss_collector.sort_articles(items)
+
+
+@register_source('reddit')
+class RedditSource(Source):
+    kind = 'reddit'
+
+    def targets(self) -> List[str]:
+        return list(config.NEWS_SOURCES['reddit']['subreddits'])
+
+    async def fetch(self, session, target: str) -> List[Dict]:
+        return await self.owner.reddit_collector.fetch_subreddit_async(session, target, strict=True)
+
+    def sort_items(self, items: List[Dict]) -> List[Dict]:
+        return self.owner.reddit_collector.sort_posts(items)
+
+
+@register_source('reddit_comments')
+class RedditCommentsSource(Source):
+    """Comment trees of the most discussed posts from the latest Reddit listings"""
+    kind = 'comments'
+    after = ('reddit',)
+
+    def __init__(self, *args, posts: int = 10, max_depth: int = 4, max_comments: int = 200,
+                 max_bytes: int = 2 * 2**20, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.posts = posts
+        self.limits = CommentLimits(max_depth=max_depth, max_comments=max_comments, max_bytes=max_bytes)
+        self._posts: Dict[str, Dict] = {}
+        if reddit_comments.ijson is None:
+            print(f"ijson is not installed: comment threads are parsed with json.loads and threads over "
+                  f"{max_bytes} bytes are skipped")
+
+    def targets(self) -> List[str]:
+        posts = self.owner.scheduler.items_by_kind()['reddit']
+        top = sorted(posts, key=lambda post: post.get('num_comments', 0), reverse=True)[:self.posts]
+        self._posts = {post['permalink']: post for post in top}
+        return list(self._posts)
+
+    async def fetch(self, session, target: str) -> List[Dict]:
+        return await self.owner.reddit_collector.fetch_comments_async(session, self._posts[target], self.limits,
+                                                                      strict=True)
+
+
+@register_source('financial')
+class FinancialSource(Source):
+    kind = 'financial'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # yfinance is blocking; a private pool means a download that overruns
+        # its deadline never holds up the event loop's shutdown
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"source-{self.name}")
+
+    def targets(self) -> List[str]:
+        return ['indices']
+
+    async def fetch(self, session, target: str) -> List[Dict]:
+        loop = asyncio.get_running_loop()
+        # The scheduler already paces this source, so the collector's 5-minute quote cache is bypassed
+        quotes = await loop.run_in_executor(self._executor, self.owner.financial_collector.get_market_indices, True)
+        if not quotes:
+            # Index quotes are never legitimately empty; keep the last ones
+            raise RuntimeError("no index quotes returned")
+        return quotes
+
+
+def create_sources(owner, settings: Dict[str, Dict] = None) -> List[Source]:
+    """Instantiate every source configured in `settings` (config.SOURCES_CONFIG)"""
+    sources = []
+    for name, options in (settings or config.SOURCES_CONFIG).items():
+        options = dict(options)
+        if not options.pop('enabled', True):
+            continue
+        source_type = options.pop('type', name)
+        if source_type not in SOURCE_TYPES:
+            raise ValueError(f"Unknown source type {source_type!r}; registered: {', '.join(sorted(SOURCE_TYPES))}")
+        sources.append(SOURCE_TYPES[source_type](owner, name, **options))
+    return sources
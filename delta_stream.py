@@ -0,0 +1,186 @@
+"""
+Delta Stream - Compact snapshot diffs pushed to dashboard clients over Server-Sent Events
+"""
+import queue
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Set
+from incremental_aggregator import IncrementalAggregator
+from metrics import registry
+from snapshot import SerializedSnapshot, encode_json
+import config
+
+# Scalar sections sent whole whenever they differ from the previous snapshot
+WHOLE_FIELDS = ('news_sentiment', 'reddit_sentiment', 'trending_stocks', 'summary')
+TOP_FIELDS = ('top_news', 'top_reddit')
+
+
+def _top_changes(previous: List[Dict], current: List[Dict]) -> Optional[Dict]:
+    """New stories (full documents) plus the new order as keys, or None if the list is unchanged"""
+    keys = [IncrementalAggregator.document_key(doc) for doc in current]
+    previous_keys = {IncrementalAggregator.document_key(doc) for doc in previous}
+    if keys == [IncrementalAggregator.document_key(doc) for doc in previous]:
+        return None
+    return {'order': keys, 'new': [doc for key, doc in zip(keys, current) if key not in previous_keys]}
+
+
+def _keyed_changes(previous: Dict[str, Dict], current: Dict[str, Dict]) -> Dict[str, Optional[Dict]]:
+    """Entries that were added or changed, and None for the ones that disappeared"""
+    changes = {key: value for key, value in current.items() if previous.get(key) != value}
+    changes.update({key: None for key in previous if key not in current})
+    return changes
+
+
+def compute_delta(previous: Dict, current: Dict) -> Dict:
+    """Difference between two intelligence dicts; empty when nothing a client shows changed"""
+    delta = {}
+    for field in WHOLE_FIELDS:
+        if previous.get(field) != current.get(field):
+            delta[field] = current.get(field)
+    for field in TOP_FIELDS:
+        changes = _top_changes(previous.get(field) or [], current.get(field) or [])
+        if changes is not None:
+            delta[field] = changes
+    tickers = _keyed_changes(previous.get('per_ticker_sentiment') or {}, current.get('per_ticker_sentiment') or {})
+    if tickers:
+        delta['per_ticker_sentiment'] = tickers
+    indices = _keyed_changes({quote['symbol']: quote for quote in previous.get('market_indices') or []},
+                             {quote['symbol']: quote for quote in current.get('market_indices') or []})
+    if indices:
+        delta['market_indices'] = indices
+    return delta
+
+
+def sse_frame(event: str, data, event_id: int = None) -> bytes:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.insert(0, f"id: {event_id}")
+    return ('\n'.join(lines) + '\n').encode('utf-8') + b'data: ' + encode_json(data) + b'\n\n'
+
+
+KEEPALIVE_FRAME = b': keepalive\n\n'
+
+
+class Subscription:
+    """One connected client: a queue of pre-encoded frames shared with every other client"""
+
+    def __init__(self, broadcaster: 'DeltaBroadcaster', frames: List[bytes]):
+        self.broadcaster = broadcaster
+        self.queue: 'queue.Queue[Optional[bytes]]' = queue.Queue()
+        for frame in frames:
+            self.queue.put(frame)
+
+    def events(self, keepalive: float = None) -> Iterator[bytes]:
+        """Frames for the response body; ends (and unsubscribes) when the client lags or disconnects"""
+        keepalive = keepalive or config.STREAM_CONFIG['keepalive']
+        try:
+            while True:
+                try:
+                    frame = self.queue.get(timeout=keepalive)
+                except queue.Empty:
+                    yield KEEPALIVE_FRAME
+                    continue
+                if frame is None:
+                    # Dropped for lagging; the client reconnects with Last-Event-ID
+                    return
+                yield frame
+        finally:
+            self.broadcaster.unsubscribe(self)
+
+
+class DeltaBroadcaster:
+    """Diffs each new snapshot against the previous one and fans the result out.
+
+    The diff is computed and encoded once per refresh; subscribers only
+    receive a reference to the same bytes. A client more than `queue_size`
+    frames behind is disconnected instead of buffering without bound, and
+    the last `history` deltas are replayed to clients reconnecting with
+    Last-Event-ID. Anyone further behind gets a `reset` event and should
+    re-fetch /api/intelligence.
+    """
+
+    def __init__(self, queue_size: int = None, history: int = None, max_subscribers: int = None):
+        settings = config.STREAM_CONFIG
+        self.queue_size = queue_size or settings['queue_size']
+        self.max_subscribers = max_subscribers or settings['max_subscribers']
+        self.sequence = 0
+        self.etag: Optional[str] = None
+        self._previous: Optional[Dict] = None
+        self._history: Deque = deque(maxlen=history or settings['history'])  # (sequence, frame)
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        registry.register_callback('stream', self.metric_samples)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def metric_samples(self):
+        yield 'swarm_stream_subscribers', {}, len(self._subscribers)
+
+    def publish(self, snapshot: SerializedSnapshot) -> Optional[Dict]:
+        """Send subscribers the diff from the previous snapshot; returns it (None if nothing changed)"""
+        with registry.timer('swarm_stage_seconds', stage='delta'):
+            previous, self._previous = self._previous, snapshot.data
+            changes = compute_delta(previous, snapshot.data) if previous is not None else None
+            with self._lock:
+                self.etag = snapshot.etag
+                if previous is None:
+                    # Nothing to diff against (first refresh since start): clients re-fetch
+                    frame, delta = sse_frame('reset', {'etag': self.etag}), None
+                elif changes:
+                    self.sequence += 1
+                    delta = {'seq': self.sequence, 'etag': self.etag,
+                             'timestamp': snapshot.data.get('timestamp'), 'published_at': time.time(),
+                             'changes': changes}
+                    frame = sse_frame('delta', delta, self.sequence)
+                    self._history.append((self.sequence, frame))
+                else:
+                    return None
+                subscribers = list(self._subscribers)
+            self._fan_out(frame, subscribers)
+        if delta is not None:
+            registry.inc('swarm_stream_events_total')
+        return delta
+
+    def _fan_out(self, frame: bytes, subscribers: List[Subscription]):
+        delivered = 0
+        for subscription in subscribers:
+            if subscription.queue.qsize() >= self.queue_size:
+                self.drop(subscription)
+                registry.inc('swarm_stream_dropped_total')
+                continue
+            subscription.queue.put(frame)
+            delivered += 1
+        registry.inc('swarm_stream_bytes_total', len(frame) * delivered)
+
+    def subscribe(self, last_event_id: int = None) -> Optional[Subscription]:
+        """Register a client (None when full); it first gets a `hello` frame and any missed deltas"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            frames = [sse_frame('hello', {'seq': self.sequence, 'etag': self.etag})]
+            if last_event_id is not None and last_event_id != self.sequence:
+                missed = [frame for sequence, frame in self._history if sequence > last_event_id]
+                if 0 <= last_event_id < self.sequence and len(missed) == self.sequence - last_event_id:
+                    frames.extend(missed)
+                else:
+                    # Too far behind, or an id from before a restart
+                    frames.append(sse_frame('reset', {'etag': self.etag}))
+            subscription = Subscription(self, frames)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def drop(self, subscription: Subscription):
+        """Disconnect a client; its stream ends after the frames already queued"""
+        self.unsubscribe(subscription)
+        subscription.queue.put(None)
+
+    def close(self):
+        """Disconnect every client (e.g. on shutdown)"""
+        for subscription in list(self._subscribers):
+            self.drop(subscription)
@@ -0,0 +1,155 @@
+"""
+Document Batch - Columnar per-document state for large scoring windows
+"""
+import sys
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from document_processor import DocumentScore
+from time_index import TimeIndex
+
+
+class SourceNames:
+    """Feed titles and subreddits interned to small integer ids"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def id(self, name: str) -> int:
+        source_id = self._ids.get(name)
+        if source_id is None:
+            source_id = self._ids[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return source_id
+
+
+# Shared by every batch; bounded by the number of configured feeds and subreddits
+source_names = SourceNames()
+
+
+class DocumentBatch:
+    """One window of scored documents for a source kind, stored column by column.
+
+    Per document only its key, title, a hash of its text, publication time
+    (epoch seconds, 0 when undated), series timestamp (publication or first
+    seen), ranking value (publication time for news, score for Reddit),
+    source id, sentiment counts and tickers are kept, in NumPy columns where
+    numeric. The documents themselves are not retained; callers keep the top N.
+    """
+
+    __slots__ = ('kind', 'keys', 'index', 'titles', 'fingerprints', 'published', 'timestamps', 'ranks',
+                 'source_ids', 'sentiment', 'text_sentiment', 'tickers', '_time_index')
+
+    def __init__(self, kind: str, keys: List[str] = None, titles: List[str] = None, fingerprints=(),
+                 published=(), timestamps=(), ranks=(), source_ids=(), sentiment=(), text_sentiment=(),
+                 tickers: List[Tuple[str, ...]] = None, index: Dict[str, int] = None):
+        self.kind = kind
+        self.keys = keys or []
+        self.index: Dict[str, int] = index if index is not None else {key: row for row, key in enumerate(self.keys)}
+        self.titles = titles or []
+        self.fingerprints = np.asarray(fingerprints, dtype=np.int64)
+        self.published = np.asarray(published, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.ranks = np.asarray(ranks, dtype=np.float64)
+        self.source_ids = np.asarray(source_ids, dtype=np.int32)
+        self.sentiment = np.asarray(sentiment, dtype=np.int32).reshape(-1, 3)
+        self.text_sentiment = np.asarray(text_sentiment, dtype=np.int32).reshape(-1, 3)
+        self.tickers = tickers or []
+        self._time_index: Optional[TimeIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def score(self, row: int) -> DocumentScore:
+        return DocumentScore(self.kind, tuple(self.sentiment[row].tolist()),
+                             tuple(self.text_sentiment[row].tolist()), self.tickers[row])
+
+    def top(self, n: int) -> List[int]:
+        """Rows of the n highest ranks, best first; earlier rows win ties like a stable sort"""
+        total = len(self.keys)
+        if n <= 0 or total == 0:
+            return []
+        if n < total:
+            # argpartition finds the n-th best rank; everything above it is in,
+            # and ties on it are filled in row order
+            threshold = self.ranks[np.argpartition(-self.ranks, n - 1)[n - 1]]
+            above = np.flatnonzero(self.ranks > threshold)
+            tied = np.flatnonzero(self.ranks == threshold)[:n - len(above)]
+            rows = np.concatenate([above, tied])
+        else:
+            rows = np.arange(total)
+        return rows[np.lexsort((rows, -self.ranks[rows]))].tolist()
+
+    @property
+    def time_index(self) -> TimeIndex:
+        """Rows by publication time with sentiment prefix sums, built on first use"""
+        if self._time_index is None:
+            self._time_index = TimeIndex(self.published, self.sentiment)
+        return self._time_index
+
+    def describe(self, row: int) -> Dict:
+        """Compact view of one row, as served by the documents API"""
+        published = int(self.published[row])
+        positive, negative, neutral = self.sentiment[row].tolist()
+        return {
+            'key': self.keys[row],
+            'title': self.titles[row],
+            'source': source_names.names[self.source_ids[row]],
+            'published_ts': published or None,
+            'sentiment': {'positive': positive, 'negative': negative, 'neutral': neutral},
+            'tickers': list(self.tickers[row])
+        }
+
+    def source_counts(self) -> Dict[str, int]:
+        """Documents per feed / subreddit"""
+        counts = np.bincount(self.source_ids, minlength=len(source_names.names)) if len(self) else []
+        return {source_names.names[source_id]: int(count) for source_id, count in enumerate(counts) if count}
+
+
+class DocumentBatchBuilder:
+    """Collects rows in plain lists and converts them to columns once in `build`"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.keys: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.titles: List[str] = []
+        self.fingerprints: List[int] = []
+        self.published: List[int] = []
+        self.timestamps: List[int] = []
+        self.ranks: List[float] = []
+        self.source_ids: List[int] = []
+        self.scores: List[Optional[DocumentScore]] = []
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def append(self, key: str, title: str, fingerprint: int, published: int, timestamp: int, rank: float,
+               source: str, score: Optional[DocumentScore] = None) -> int:
+        """Add a row (score may be filled in later with set_score) and return its number"""
+        row = self.index[key] = len(self.keys)
+        self.keys.append(key)
+        self.titles.append(title)
+        self.fingerprints.append(fingerprint)
+        self.published.append(published)
+        self.timestamps.append(timestamp)
+        self.ranks.append(rank)
+        self.source_ids.append(source_names.id(source))
+        self.scores.append(score)
+        return row
+
+    def set_score(self, row: int, score: DocumentScore):
+        self.scores[row] = score
+
+    def build(self) -> DocumentBatch:
+        return DocumentBatch(
+            self.kind, self.keys, self.titles, self.fingerprints, self.published, self.timestamps, self.ranks,
+            self.source_ids,
+            [score.sentiment for score in self.scores],
+            [score.text_sentiment for score in self.scores],
+            [score.tickers for score in self.scores],
+            self.index
+        )
@@ -0,0 +1,203 @@
+"""
+Document Processor - Single-pass streaming aggregation over news and Reddit items
+"""
+import heapq
+from collections import Counter
+from itertools import count, islice
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+from article_store import document_timestamp
+
+# Kinds scored as another kind: comments count towards Reddit sentiment and
+# tickers like posts do, but are never ranked among the top stories
+SCORED_AS = {'comments': 'reddit'}
+
+
+class DocumentScore(NamedTuple):
+    """Everything the aggregate needs from one document, computed once"""
+    kind: str  # 'rss' or 'reddit'
+    sentiment: Tuple[int, int, int]  # (positive, negative, neutral) for the global totals
+    text_sentiment: Tuple[int, int, int]  # (positive, negative, neutral) over title + body
+    tickers: Tuple[str, ...]
+
+
+def _empty_sentiment() -> Dict[str, int]:
+    return {'positive': 0, 'negative': 0, 'neutral': 0}
+
+
+def _neutral(positive: int, negative: int) -> int:
+    return 1 if positive == 0 and negative == 0 else 0
+
+
+class DocumentProcessor:
+    """Reads each document exactly once and folds it into every output.
+
+    Global sentiment, ticker mentions, per-ticker sentiment and the top-N
+    stories are all updated from the same scan, so documents can be fed
+    from any iterator and only the top-N items are ever retained.
+    """
+
+    def __init__(self, engine, top_n: int = 10):
+        self.engine = engine
+        self.top_n = top_n
+        self.news_sentiment = _empty_sentiment()
+        self.reddit_sentiment = _empty_sentiment()
+        self.mentions = Counter()
+        self.per_ticker: Dict[str, Dict[str, int]] = {}
+        self._top_news: List[tuple] = []
+        self._top_reddit: List[tuple] = []
+        self._seq = count()
+
+    @staticmethod
+    def _texts(doc: Dict, kind: str) -> Tuple[str, str]:
+        body = doc.get('selftext', '') if kind == 'reddit' else doc.get('summary', '')
+        return doc.get('title', ''), body
+
+    def score(self, doc: Dict, kind: str = None) -> DocumentScore:
+        """Tokenize, score and extract tickers for one document"""
+        return self.score_batch([doc], kind)[0]
+
+    def score_batch(self, docs: List[Dict], kind: str = None) -> List[DocumentScore]:
+        """Score a list of documents, resolving tickers for all of them in one pass"""
+        kinds = [kind or doc.get('source_type', 'rss') for doc in docs]
+        kinds = [SCORED_AS.get(doc_kind, doc_kind) for doc_kind in kinds]
+        texts = [self._texts(doc, doc_kind) for doc, doc_kind in zip(docs, kinds)]
+        tickers = self.engine.extract_tickers_batch([f"{title} {body}" for title, body in texts])
+
+        lexicon = self.engine.lexicon
+        scores = []
+        for doc_kind, (title, body), doc_tickers in zip(kinds, texts, tickers):
+            title_pos, title_neg = lexicon.count(title)
+            body_pos, body_neg = lexicon.count(body)
+            text_pos, text_neg = title_pos + body_pos, title_neg + body_neg
+
+            # News sentiment has always been scored on the summary alone
+            if doc_kind == 'reddit':
+                sentiment = (text_pos, text_neg, _neutral(text_pos, text_neg))
+            else:
+                sentiment = (body_pos, body_neg, _neutral(body_pos, body_neg))
+
+            scores.append(DocumentScore(
+                kind=doc_kind,
+                sentiment=sentiment,
+                text_sentiment=(text_pos, text_neg, _neutral(text_pos, text_neg)),
+                tickers=doc_tickers
+            ))
+        return scores
+
+    def apply(self, score: DocumentScore, sign: int = 1):
+        """Fold a scored document into the running counters (sign=-1 retracts it)"""
+        totals = self.reddit_sentiment if score.kind == 'reddit' else self.news_sentiment
+        positive, negative, neutral = score.sentiment
+        totals['positive'] += sign * positive
+        totals['negative'] += sign * negative
+        totals['neutral'] += sign * neutral
+
+        if not score.tickers:
+            return
+
+        positive, negative, neutral = score.text_sentiment
+        for symbol in score.tickers:
+            self.mentions[symbol] += sign
+            counts = self.per_ticker.get(symbol)
+            if counts is None:
+                counts = self.per_ticker[symbol] = _empty_sentiment()
+            counts['positive'] += sign * positive
+            counts['negative'] += sign * negative
+            counts['neutral'] += sign * neutral
+
+        if sign < 0:
+            # Every mention contributes either a hit or a neutral count, so an
+            # all-zero entry means no remaining document mentions the ticker
+            for symbol in set(score.tickers):
+                if self.mentions[symbol] <= 0:
+                    del self.mentions[symbol]
+                if not any(self.per_ticker[symbol].values()):
+                    del self.per_ticker[symbol]
+
+    def retract(self, score: DocumentScore):
+        """Remove a previously applied document from the running counters"""
+        self.apply(score, sign=-1)
+
+    def _offer_top(self, doc: Dict, kind: str):
+        """Keep the doc if it ranks in the top N (newest news / highest-scored posts)"""
+        if doc.get('source_type') in SCORED_AS:
+            return
+        if kind == 'reddit':
+            heap, key = self._top_reddit, doc.get('score', 0)
+        else:
+            heap, key = self._top_news, document_timestamp(doc)
+        # Negated sequence number keeps the earlier document on ties, matching a stable sort
+        entry = (key, -next(self._seq), doc)
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def process(self, doc: Dict, kind: str = None) -> DocumentScore:
+        """Score one document, fold it in and consider it for the top-N"""
+        score = self.score(doc, kind)
+        self.apply(score)
+        self._offer_top(doc, score.kind)
+        return score
+
+    def consume(self, documents: Iterable[Dict], kind: str = None, chunk_size: int = 1000) -> 'DocumentProcessor':
+        """Process every document from an iterable (lists, generators, ...) in scoring batches"""
+        documents = iter(documents)
+        while True:
+            chunk = list(islice(documents, chunk_size))
+            if not chunk:
+                return self
+            for doc, score in zip(chunk, self.score_batch(chunk, kind)):
+                self.apply(score)
+                self._offer_top(doc, score.kind)
+
+    def merge(self, other: 'DocumentProcessor') -> 'DocumentProcessor':
+        """Fold another processor's partial results into this one.
+
+        Merging is associative, so shards scored independently (e.g. in
+        worker processes) and merged in document order give the same
+        result as one processor reading every document.
+        """
+        for totals, partial in ((self.news_sentiment, other.news_sentiment),
+                                (self.reddit_sentiment, other.reddit_sentiment)):
+            for label, value in partial.items():
+                totals[label] += value
+        self.mentions.update(other.mentions)
+        for symbol, partial in other.per_ticker.items():
+            counts = self.per_ticker.get(symbol)
+            if counts is None:
+                counts = self.per_ticker[symbol] = _empty_sentiment()
+            for label, value in partial.items():
+                counts[label] += value
+        # Re-offer in the shard's own order so earlier documents still win ties
+        for kind, heap in (('rss', other._top_news), ('reddit', other._top_reddit)):
+            for _, _, doc in sorted(heap, key=lambda entry: -entry[1]):
+                self._offer_top(doc, kind)
+        return self
+
+    def __getstate__(self) -> Dict:
+        # Partials travel between processes without the engine or the sequence counter
+        state = self.__dict__.copy()
+        del state['engine'], state['_seq']
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self.engine = None
+        self._seq = count()
+
+    @staticmethod
+    def _ranked(heap: List[tuple]) -> List[Dict]:
+        return [entry[2] for entry in sorted(heap, reverse=True)]
+
+    def top_news(self) -> List[Dict]:
+        return self._ranked(self._top_news)
+
+    def top_reddit(self) -> List[Dict]:
+        return self._ranked(self._top_reddit)
+
+    def trending_stocks(self, n: int = 20) -> Dict[str, int]:
+        return dict(self.mentions.most_common(n))
+
+    def per_ticker_summary(self) -> Dict[str, Dict]:
+        return self.engine.summarize_per_ticker(self.per_ticker)
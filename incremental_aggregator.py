@@ -0,0 +1,163 @@
+"""
+Incremental Aggregator - Keeps intelligence counters alive between refresh cycles
+"""
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from article_store import document_timestamp
+from document_batch import DocumentBatch, DocumentBatchBuilder
+from document_processor import SCORED_AS, DocumentProcessor, DocumentScore
+
+
+class SyncStats(NamedTuple):
+    added: int
+    changed: int
+    unchanged: int
+    retracted: int
+
+
+class IncrementalAggregator(DocumentProcessor):
+    """DocumentProcessor whose state persists across refreshes.
+
+    Documents are keyed by article link / Reddit permalink. Each sync only
+    scores documents that are new or whose text changed, and retracts the
+    contribution of documents that dropped out of the source's window, so
+    refresh cost scales with the number of new items. Per-document state
+    lives in a columnar DocumentBatch and only the top-N documents are kept.
+    """
+
+    def __init__(self, engine, top_n: int = 10, store=None, series=None):
+        super().__init__(engine, top_n)
+        # Optional ArticleStore: scores survive restarts and are never paid twice
+        self.store = store
+        # Optional SentimentSeries: every newly seen document lands in its time bucket
+        self.series = series
+        self.scoring_signature = engine.scoring_signature()
+        self.documents: Dict[str, DocumentBatch] = {kind: DocumentBatch(SCORED_AS.get(kind, kind))
+                                                    for kind in ('rss', 'reddit', 'comments')}
+        # Best documents of the current window per kind, ranked at sync time
+        self._top: Dict[str, List[Dict]] = {'rss': [], 'reddit': []}
+
+    @staticmethod
+    def document_key(doc: Dict) -> str:
+        return doc.get('permalink') or doc.get('link') or doc.get('url') or doc.get('title', '')
+
+    @staticmethod
+    def fingerprint(doc: Dict, kind: str) -> Tuple[str, str]:
+        body = doc.get('selftext', '') if kind == 'reddit' else doc.get('summary', '')
+        return doc.get('title', ''), body
+
+    @staticmethod
+    def source_name(doc: Dict, kind: str) -> str:
+        return f"r/{doc.get('subreddit', '')}" if kind == 'reddit' else doc.get('source', '')
+
+    def _stored_score(self, doc: Dict, kind: str) -> Optional[DocumentScore]:
+        if self.store is None:
+            return None
+        scored_as = SCORED_AS.get(kind, kind)
+        text_fields = ('title', 'selftext' if scored_as == 'reddit' else 'summary')
+        stored = self.store.load_score(kind, doc, self.scoring_signature, text_fields)
+        if stored is None:
+            return None
+        stored_kind, sentiment, text_sentiment, tickers = stored
+        if stored_kind != scored_as:
+            return None
+        return DocumentScore(stored_kind, tuple(sentiment), tuple(text_sentiment), tuple(tickers))
+
+    def _record(self, ts: int, score: DocumentScore, sign: int = 1):
+        if self.series is not None:
+            self.series.record(ts, score, sign)
+
+    def sync(self, kind: str, docs: Iterable[Dict]) -> SyncStats:
+        """Replace the window for one source kind ('rss', 'reddit' or 'comments') with `docs`"""
+        previous = self.documents[kind]
+        scored_as = SCORED_AS.get(kind, kind)
+        seen = np.zeros(len(previous), dtype=bool)
+        current = DocumentBatchBuilder(scored_as)
+        window = []
+        to_score = []
+        added = changed = unchanged = 0
+
+        for doc in docs:
+            key = self.document_key(doc)
+            if key in current:
+                continue  # same item listed twice in one window
+            title, body = self.fingerprint(doc, scored_as)
+            fingerprint = hash((title, body))
+            row = previous.index.get(key)
+            window.append(doc)
+            published = document_timestamp(doc)
+            # Top-N ordering: newest news, highest-scored Reddit posts
+            rank = doc.get('score', 0) if scored_as == 'reddit' else published
+            source = self.source_name(doc, scored_as)
+
+            if row is not None:
+                seen[row] = True
+                old_ts = int(previous.timestamps[row])
+                if previous.fingerprints[row] == fingerprint:
+                    # Text is unchanged; keep the score, refresh ranking fields
+                    current.append(key, title, fingerprint, published, old_ts, rank, source, previous.score(row))
+                    unchanged += 1
+                    continue
+                old = previous.score(row)
+                self.retract(old)
+                self._record(old_ts, old, sign=-1)
+                changed += 1
+                score = None
+            else:
+                added += 1
+                score = self._stored_score(doc, kind)
+
+            # Undated items are bucketed at the time they were first seen
+            ts = published or int(time.time())
+            new_row = current.append(key, title, fingerprint, published, ts, rank, source, score)
+            if score is None:
+                # Filled in once the whole batch of new text is scored below
+                to_score.append((new_row, doc))
+            else:
+                self.apply(score)
+                self._record(ts, score)
+
+        newly_scored = []
+        if to_score:
+            scores = self.score_batch([doc for _, doc in to_score], scored_as)
+            for (row, doc), score in zip(to_score, scores):
+                self.apply(score)
+                self._record(current.timestamps[row], score)
+                current.set_score(row, score)
+                newly_scored.append((doc, score))
+
+        # Whatever was not seen this round fell out of the window
+        stale = np.flatnonzero(~seen)
+        for row in stale.tolist():
+            self.retract(previous.score(row))
+
+        batch = self.documents[kind] = current.build()
+        if kind in self._top:
+            # News is ranked newest first straight off the time index
+            ranked = batch.time_index.newest(self.top_n) if kind == 'rss' else batch.top(self.top_n)
+            self._top[kind] = [window[row] for row in ranked]
+        if self.store is not None and newly_scored:
+            self.store.ingest(kind, newly_scored, self.scoring_signature)
+        return SyncStats(added, changed, unchanged, len(stale))
+
+    def recent(self, kind: str, since_ts: float = None, until_ts: float = None, limit: int = None) -> Dict:
+        """Documents of one kind published in [since_ts, until_ts), newest first, with window sentiment"""
+        batch = self.documents[kind]
+        index = batch.time_index
+        positive, negative, neutral = index.totals(since_ts, until_ts).tolist()
+        lo, hi = index.span(since_ts, until_ts)
+        return {
+            'kind': kind,
+            'since_ts': since_ts,
+            'until_ts': until_ts,
+            'total': hi - lo,
+            'sentiment': {'positive': positive, 'negative': negative, 'neutral': neutral},
+            'documents': [batch.describe(row) for row in index.rows(since_ts, until_ts, limit).tolist()]
+        }
+
+    def top_news(self) -> List[Dict]:
+        return list(self._top['rss'])
+
+    def top_reddit(self) -> List[Dict]:
+        return list(self._top['reddit'])
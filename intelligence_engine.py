@@ -1,68 +1,59 @@
 """
 Market Intelligence Engine - Analyzes and aggregates data
 """
-from typing import List, Dict
+from typing import List, Dict, Iterable, Tuple
 from collections import Counter
 from datetime import datetime, timedelta
-import re
+import hashlib
+from sentiment_lexicon import SentimentLexicon
+from ticker_universe import TickerUniverse
+from document_processor import DocumentProcessor
 
 class IntelligenceEngine:
-    def __init__(self):
-        self.stock_pattern = re.compile(r'\$?[A-Z]{1,5}\b')
+    def __init__(self, lexicon: SentimentLexicon = None, universe: TickerUniverse = None):
+        self.lexicon = lexicon or SentimentLexicon()
+        self.universe = universe or TickerUniverse.load()
+        self.stock_pattern = self.universe.pattern
+    
+    def scoring_signature(self) -> str:
+        """Short fingerprint of the lexicon and ticker rules; stored scores are only reused if it matches"""
+        rules = '|'.join(self.lexicon.positive_words + ['/'] + self.lexicon.negative_words + [self.universe.signature()])
+        return hashlib.sha1(rules.encode('utf-8')).hexdigest()[:12]
     
     def analyze_sentiment(self, text: str) -> Dict[str, int]:
         """Simple sentiment analysis using keyword matching"""
-        positive_words = ['bull', 'bullish', 'up', 'rise', 'gain', 'profit', 'buy', 'moon', 'rocket', 'surge']
-        negative_words = ['bear', 'bearish', 'down', 'fall', 'loss', 'crash', 'sell', 'dump', 'plunge', 'drop']
-        
-        text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+        return self.lexicon.analyze(text)
         
-        return {
-            'positive': positive_count,
-            'negative': negative_count,
-            'neutral': 1 if positive_count == 0 and negative_count == 0 else 0
-        }
+    def analyze_sentiment_batch(self, texts: List[str]) -> Dict[str, int]:
+        """Score a list of documents at once and return summed sentiment"""
+        return self.lexicon.totals(self.lexicon.score_batch(texts))
+    
+    def extract_tickers(self, text: str) -> List[str]:
+        """Extract every known stock symbol occurrence from a piece of text"""
+        return self.universe.extract(text)
+    
+    def extract_tickers_batch(self, texts: List[str]) -> List[Tuple[str, ...]]:
+        """Extract tickers for a whole list of documents in one pass"""
+        return self.universe.extract_batch(texts)
     
     def extract_stock_mentions(self, articles: List[Dict]) -> Dict[str, int]:
         """Extract and count stock symbol mentions"""
         mentions = []
         for article in articles:
             text = f"{article.get('title', '')} {article.get('summary', '')}"
-            found = self.stock_pattern.findall(text)
-            mentions.extend([m.replace('$', '').upper() for m in found if len(m.replace('$', '')) <= 5])
+            mentions.extend(self.extract_tickers(text))
         
         return dict(Counter(mentions).most_common(20))
 
     def compute_per_ticker_sentiment(self, news: List[Dict], reddit: List[Dict]) -> Dict[str, Dict[str, int]]:
         """Compute sentiment counts per ticker symbol extracted from news + reddit"""
-        per_ticker = {}
-
-        # Helper to update counts
-        def _update_for_text(symbols, text):
-            sentiment = self.analyze_sentiment(text)
-            for s in symbols:
-                if s not in per_ticker:
-                    per_ticker[s] = {'positive': 0, 'negative': 0, 'neutral': 0}
-                per_ticker[s]['positive'] += sentiment.get('positive', 0)
-                per_ticker[s]['negative'] += sentiment.get('negative', 0)
-                per_ticker[s]['neutral'] += sentiment.get('neutral', 0)
-
-        # Process news
-        for article in news:
-            text = f"{article.get('title', '')} {article.get('summary', '')}"
-            found = [m.replace('$', '').upper() for m in self.stock_pattern.findall(text) if len(m.replace('$', '')) <= 5]
-            if found:
-                _update_for_text(found, text)
-
-        # Process reddit
-        for post in reddit:
-            text = f"{post.get('title', '')} {post.get('selftext', '')}"
-            found = [m.replace('$', '').upper() for m in self.stock_pattern.findall(text) if len(m.replace('$', '')) <= 5]
-            if found:
-                _update_for_text(found, text)
+        processor = DocumentProcessor(self)
+        processor.consume(news, kind='rss')
+        processor.consume(reddit, kind='reddit')
+        return processor.per_ticker_summary()
 
+    def summarize_per_ticker(self, per_ticker: Dict[str, Dict[str, int]]) -> Dict[str, Dict]:
+        """Convert raw per-ticker counts to the public summary format"""
         # Convert counts to a simple summary (optionally add percent positive)
         summary = {}
         for s, counts in per_ticker.items():
@@ -79,41 +70,33 @@ class IntelligenceEngine:
 
         return summary
     
-    def aggregate_intelligence(self, news: List[Dict], reddit: List[Dict], financial: List[Dict]) -> Dict:
+    def aggregate_intelligence(self, news: Iterable[Dict], reddit: Iterable[Dict], financial: List[Dict]) -> Dict:
         """Aggregate all intelligence sources"""
-        # Analyze news sentiment
-        news_sentiment = {'positive': 0, 'negative': 0, 'neutral': 0}
-        for article in news:
-            sentiment = self.analyze_sentiment(article.get('summary', ''))
-            news_sentiment['positive'] += sentiment['positive']
-            news_sentiment['negative'] += sentiment['negative']
-            news_sentiment['neutral'] += sentiment['neutral']
-        
-        # Analyze Reddit sentiment
-        reddit_sentiment = {'positive': 0, 'negative': 0, 'neutral': 0}
-        for post in reddit:
-            text = f"{post.get('title', '')} {post.get('selftext', '')}"
-            sentiment = self.analyze_sentiment(text)
-            reddit_sentiment['positive'] += sentiment['positive']
-            reddit_sentiment['negative'] += sentiment['negative']
-            reddit_sentiment['neutral'] += sentiment['neutral']
+        # One pass over every document feeds sentiment, tickers and top stories
+        processor = DocumentProcessor(self)
+        processor.consume(news, kind='rss')
+        processor.consume(reddit, kind='reddit')
+        return self.build_intelligence(processor, financial)
         
-        # Extract trending stocks
-        all_content = news + reddit
-        trending_stocks = self.extract_stock_mentions(all_content)
+    def aggregate_stream(self, documents: Iterable[Dict], financial: List[Dict]) -> Dict:
+        """Aggregate a mixed stream of news/Reddit documents keyed by source_type"""
+        processor = DocumentProcessor(self).consume(documents)
+        return self.build_intelligence(processor, financial)
         
-        # Get top stories
-        top_news = sorted(news, key=lambda x: x.get('published', ''), reverse=True)[:10]
-        top_reddit = sorted(reddit, key=lambda x: x.get('score', 0), reverse=True)[:10]
+    def build_intelligence(self, processor: DocumentProcessor, financial: List[Dict]) -> Dict:
+        """Assemble the public intelligence dict from a filled processor"""
+        trending_stocks = processor.trending_stocks()
+        news_sentiment = dict(processor.news_sentiment)
+        reddit_sentiment = dict(processor.reddit_sentiment)
         
         return {
             'timestamp': datetime.now().isoformat(),
             'news_sentiment': news_sentiment,
             'reddit_sentiment': reddit_sentiment,
-            'per_ticker_sentiment': self.compute_per_ticker_sentiment(news, reddit),
+            'per_ticker_sentiment': processor.per_ticker_summary(),
             'trending_stocks': trending_stocks,
-            'top_news': top_news,
-            'top_reddit': top_reddit,
+            'top_news': processor.top_news(),
+            'top_reddit': processor.top_reddit(),
             'market_indices': financial,
             'summary': self._generate_summary(news_sentiment, reddit_sentiment, trending_stocks)
         }
@@ -1,13 +1,51 @@
+import argparse
+import asyncio
+import hashlib
+import re
 import sys
-from typing import Annotated, TypedDict
-from langchain_ollama import ChatOllama
-from langchain_community.tools import DuckDuckGoSearchRun
-from langgraph.graph import StateGraph, START, END
+from typing import TYPE_CHECKING, Annotated, AsyncIterator, Dict, List, TypedDict
+from cache import create_cache
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
 
 # --- 1. CONFIGURATION ---
 # I use llama3.2 because it is fast for local testing
-llm = ChatOllama(model="llama3.2", temperature=0)
-search_tool = DuckDuckGoSearchRun()
+LLM_MODEL = "llama3.2"
+
+# LangChain and LangGraph take over a second to import, so the model, the
+# search tool and the graph are built on first use (get_llm, get_search_tool,
+# get_app). Assigning llm, search_tool or analysis_cache beforehand replaces them.
+llm = None
+search_tool = None
+analysis_cache = None
+_app = None
+
+def get_llm():
+    global llm
+    if llm is None:
+        from langchain_ollama import ChatOllama
+        llm = ChatOllama(model=LLM_MODEL, temperature=0)
+    return llm
+
+def get_search_tool():
+    global search_tool
+    if search_tool is None:
+        from langchain_community.tools import DuckDuckGoSearchRun
+        search_tool = DuckDuckGoSearchRun()
+    return search_tool
+
+# Batch mode limits: a local Ollama model only serves a couple of prompts at
+# once, and DuckDuckGo throttles bursts of searches
+MAX_CONCURRENT_SEARCHES = 4
+MAX_CONCURRENT_LLM_CALLS = 2
+
+# Analyses are cached on disk by (model, prompt template, compressed raw data),
+# so re-running a competitor whose news has not changed skips the LLM entirely
+ANALYSIS_CACHE_TTL = 6 * 3600
+RAW_DATA_TOKEN_BUDGET = 800
+_pending_analyses: Dict[str, asyncio.Future] = {}
+llm_stats = {"calls": 0, "cache_hits": 0, "tokens_trimmed": 0, "tokens_saved": 0}
 
 # --- 2. DEFINE THE STATE ---
 # This keeps track of what the agents know as they work
@@ -19,71 +57,249 @@ class SwarmState(TypedDict):
 
 # --- 3. DEFINE THE AGENT NODES ---
 
-def researcher_node(state: SwarmState):
+ANALYST_PROMPT = """
+    You are a Strategic Market Analyst. 
+    Analyze the following raw data about {competitor}:
+    
+    RAW DATA: {raw_data}
+    
+    Provide a professional summary including:
+    1. Key Financial Trends
+    2. Main Competitive Threats
+    3. Strategic Recommendation (Buy/Hold/Sell perspective)
+    """
+
+_SNIPPET_SPLIT = re.compile(r'(?<=[.!?])\s+|\s*(?:\.\.\.|…)\s*|\n+')
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English)"""
+    return (len(text) + 3) // 4
+
+def compress_raw_data(raw_data: str, token_budget: int = RAW_DATA_TOKEN_BUDGET) -> str:
+    """Drop repeated search snippets and trim the rest to the token budget"""
+    seen = set()
+    kept = []
+    used = 0
+    for snippet in _SNIPPET_SPLIT.split(raw_data or ""):
+        snippet = " ".join(snippet.split())
+        normalized = _NON_WORD.sub(" ", snippet.lower()).strip()
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        cost = estimate_tokens(snippet) + 1
+        if used + cost > token_budget:
+            break
+        kept.append(snippet)
+        used += cost
+    return "\n".join(kept)
+
+def get_analysis_cache():
+    """The on-disk analysis cache, opened by the first analysis rather than at import"""
+    global analysis_cache
+    if analysis_cache is None:
+        analysis_cache = create_cache("analyses", max_size=512, default_ttl=ANALYSIS_CACHE_TTL, persist=True)
+    return analysis_cache
+
+def analysis_cache_key(competitor: str, raw_data: str) -> str:
+    model = getattr(get_llm(), "model", None) or type(get_llm()).__name__
+    material = "\x00".join([model, ANALYST_PROMPT, competitor.strip().lower(), raw_data])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def print_llm_stats():
+    lookups = llm_stats["calls"] + llm_stats["cache_hits"]
+    hit_rate = llm_stats["cache_hits"] / lookups if lookups else 0.0
+    print(f"\n📊 LLM calls: {llm_stats['calls']}, cache hits: {llm_stats['cache_hits']} ({hit_rate:.0%}), "
+          f"tokens trimmed: {llm_stats['tokens_trimmed']}, tokens saved by cache: {llm_stats['tokens_saved']}")
+
+def _limit(config: "RunnableConfig", name: str) -> asyncio.Semaphore:
+    """Concurrency limit shared by every graph run in a batch"""
+    limit = config.get("configurable", {}).get(name)
+    return limit if limit is not None else asyncio.Semaphore(1)
+
+async def researcher_node(state: SwarmState, config: "RunnableConfig"):
     """The Researcher Agent: Finds live data for free."""
     print(f"\n[Agent: Researcher] Finding data for {state['competitor']}...")
     
     query = f"Latest 2025-2026 market news and financial performance for {state['competitor']}"
-    search_results = search_tool.run(query)
+    async with _limit(config, "search_limit"):
+        search_results = await get_search_tool().ainvoke(query)
     
     return {
         "raw_data": search_results,
         "iteration_count": state.get("iteration_count", 0) + 1
     }
 
-def analyst_node(state: SwarmState):
+async def analyst_node(state: SwarmState, config: "RunnableConfig"):
     """The Analyst Agent: Processes raw text into strategic insights."""
     print(f"[Agent: Analyst] Processing data locally...")
     
-    prompt = f"""
-    You are a Strategic Market Analyst. 
-    Analyze the following raw data about {state['competitor']}:
+    raw_data = compress_raw_data(state['raw_data'])
+    key = analysis_cache_key(state['competitor'], raw_data)
+    prompt = ANALYST_PROMPT.format(competitor=state['competitor'], raw_data=raw_data)
+    llm_stats["tokens_trimmed"] += estimate_tokens(state['raw_data']) - estimate_tokens(raw_data)
     
-    RAW DATA: {state['raw_data']}
+    cached = get_analysis_cache().get(key)
+    loop = asyncio.get_running_loop()
+    in_flight = _pending_analyses.get(key)
+    if cached is None and in_flight is not None and in_flight.get_loop() is loop:
+        # The same prompt is already with the LLM for another run in this batch
+        cached = await asyncio.shield(in_flight)
+    if cached is not None:
+        llm_stats["cache_hits"] += 1
+        llm_stats["tokens_saved"] += estimate_tokens(prompt)
+        return {"analysis": cached}
     
-    Provide a professional summary including:
-    1. Key Financial Trends
-    2. Main Competitive Threats
-    3. Strategic Recommendation (Buy/Hold/Sell perspective)
-    """
-    
-    response = llm.invoke(prompt)
+    pending = _pending_analyses[key] = loop.create_future()
+    try:
+        async with _limit(config, "llm_limit"):
+            response = await get_llm().ainvoke(prompt)
+        llm_stats["calls"] += 1
+        get_analysis_cache().set(key, response.content)
+        pending.set_result(response.content)
+    finally:
+        # On failure waiters get None and try the LLM themselves
+        if not pending.done():
+            pending.set_result(None)
+        if _pending_analyses.get(key) is pending:
+            del _pending_analyses[key]
     return {"analysis": response.content}
 
 # --- 4. ORCHESTRATE THE GRAPH ---
 
-workflow = StateGraph(SwarmState)
+def build_graph():
+    from langgraph.graph import StateGraph, START, END
 
-# Add workers
-workflow.add_node("researcher", researcher_node)
-workflow.add_node("analyst", analyst_node)
+    workflow = StateGraph(SwarmState)
 
-# Define the workflow path
-workflow.add_edge(START, "researcher")
-workflow.add_edge("researcher", "analyst")
-workflow.add_edge("analyst", END)
+    # Add workers
+    workflow.add_node("researcher", researcher_node)
+    workflow.add_node("analyst", analyst_node)
 
-# Compile the application
-app = workflow.compile()
+    # Define the workflow path
+    workflow.add_edge(START, "researcher")
+    workflow.add_edge("researcher", "analyst")
+    workflow.add_edge("analyst", END)
+    
+    # Compile the application
+    return workflow.compile()
 
-# --- 5. EXECUTION ---
+def get_app():
+    global _app
+    if _app is None:
+        _app = build_graph()
+    return _app
 
-if __name__ == "__main__":
-    target = input("Enter a competitor to research (e.g., NVIDIA, Tesla, Apple): ")
-    
-    initial_input = {
-        "competitor": target,
+def __getattr__(name: str):
+    # `main.app` keeps working for callers that used the module-level graph
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# --- 5. BATCH RESEARCH ---
+
+def initial_state(competitor: str) -> Dict:
+    return {
+        "competitor": competitor,
         "raw_data": "",
         "analysis": "",
         "iteration_count": 0
     }
     
-    print(f"\n🚀 Starting Swarm for {target}...\n")
+async def run_batch(competitors: List[str],
+                    max_searches: int = MAX_CONCURRENT_SEARCHES,
+                    max_llm_calls: int = MAX_CONCURRENT_LLM_CALLS) -> AsyncIterator[Dict]:
+    """Research many competitors concurrently and yield each final state as soon as it is done"""
+    limits = {
+        "search_limit": asyncio.Semaphore(max_searches),
+        "llm_limit": asyncio.Semaphore(max_llm_calls)
+    }
     
-    # Run the graph
-    final_state = app.invoke(initial_input)
+    async def _research(competitor: str) -> Dict:
+        try:
+            return await get_app().ainvoke(initial_state(competitor), config={"configurable": limits})
+        except Exception as e:
+            # One failed competitor should not sink the whole batch
+            return {**initial_state(competitor), "analysis": f"Research failed: {e}"}
     
+    tasks = [asyncio.create_task(_research(c)) for c in competitors]
+    for finished in asyncio.as_completed(tasks):
+        yield await finished
+
+async def stream_research(competitor: str, limits: Dict = None) -> AsyncIterator[Dict]:
+    """Run the graph for one competitor, yielding progress and analysis tokens as they happen.
+
+    Events are dicts with an "event" key:
+      {"event": "node", "node": "researcher"}  a node finished
+      {"event": "token", "text": "..."}        a chunk of the analyst's answer
+      {"event": "done", "analysis": "..."}     the complete report
+    """
+    analysis = ""
+    async for mode, chunk in get_app().astream(initial_state(competitor), config={"configurable": limits or {}},
+                                               stream_mode=["updates", "messages"]):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") == "analyst" and message.content:
+                yield {"event": "token", "text": message.content}
+        else:
+            for node, update in chunk.items():
+                analysis = (update or {}).get("analysis", analysis)
+                yield {"event": "node", "node": node}
+    yield {"event": "done", "analysis": analysis}
+
+async def _print_stream(competitors: List[str]):
+    for competitor in competitors:
+        print("\n" + "="*50)
+        print(f"FINAL REPORT FOR {competitor.upper()}")
+        print("="*50)
+        streamed = False
+        async for event in stream_research(competitor):
+            if event["event"] == "token":
+                streamed = True
+                print(event["text"], end="", flush=True)
+            elif event["event"] == "done" and not streamed:
+                # Cached analyses arrive whole
+                print(event["analysis"], end="")
+        print()
+    print_llm_stats()
+
+def load_competitors(path: str) -> List[str]:
+    """One competitor per line; blank lines and # comments are ignored"""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+def print_report(final_state: Dict):
     print("\n" + "="*50)
-    print(f"FINAL REPORT FOR {target.upper()}")
+    print(f"FINAL REPORT FOR {final_state['competitor'].upper()}")
     print("="*50)
-    print(final_state["analysis"])
\ No newline at end of file
+    print(final_state["analysis"])
+
+async def _print_batch(competitors: List[str], max_searches: int, max_llm_calls: int):
+    async for final_state in run_batch(competitors, max_searches, max_llm_calls):
+        print_report(final_state)
+    print_llm_stats()
+
+# --- 6. EXECUTION ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Research competitors with the LangGraph swarm")
+    parser.add_argument("competitors", nargs="*", help="Competitors to research concurrently")
+    parser.add_argument("--batch", metavar="FILE", help="File with one competitor per line")
+    parser.add_argument("--max-searches", type=int, default=MAX_CONCURRENT_SEARCHES)
+    parser.add_argument("--max-llm-calls", type=int, default=MAX_CONCURRENT_LLM_CALLS)
+    parser.add_argument("--stream", action="store_true", help="Print analyses token by token, one competitor at a time")
+    args = parser.parse_args()
+    
+    targets = list(args.competitors)
+    if args.batch:
+        targets += load_competitors(args.batch)
+    if not targets:
+        targets = [input("Enter a competitor to research (e.g., NVIDIA, Tesla, Apple): ")]
+    
+    print(f"\n🚀 Starting Swarm for {', '.join(targets)}...\n")
+    
+    if args.stream:
+        asyncio.run(_print_stream(targets))
+    else:
+        # Run the graph for every target; reports print as each one finishes
+        asyncio.run(_print_batch(targets, args.max_searches, args.max_llm_calls))
\ No newline at end of file
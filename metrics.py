@@ -0,0 +1,174 @@
+"""
+Metrics - In-process counters, gauges and latency histograms in Prometheus text format
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (name, labels, value) produced at scrape time, e.g. from cache stats
+Sample = Tuple[str, Dict[str, str], float]
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    parts = []
+    for key, value in labels:
+        value = value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Cumulative bucket counts plus sum/count, as Prometheus expects"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe metric store rendered on demand.
+
+    Counters and histograms are updated where the work happens; values
+    that already live elsewhere (cache stats, snapshot age) are pulled by
+    callbacks registered with `register_callback` when metrics are scraped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._callbacks: Dict[str, Callable[[], Iterable[Sample]]] = {}
+
+    def describe(self, name: str, metric_type: str, help_text: str):
+        self._meta[name] = (metric_type, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            key = _label_key(labels)
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the wall time of a block into histogram `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def register_callback(self, name: str, callback: Callable[[], Iterable[Sample]]):
+        """Pull samples from `callback` at every scrape; re-registering a name replaces it"""
+        self._callbacks[name] = callback
+
+    def _header(self, lines: List[str], name: str, default_type: str):
+        metric_type, help_text = self._meta.get(name, (default_type, ''))
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        pulled: Dict[str, Dict[LabelKey, float]] = {}
+        for callback in list(self._callbacks.values()):
+            try:
+                for name, labels, value in callback():
+                    pulled.setdefault(name, {})[_label_key(labels)] = value
+            except Exception as e:
+                print(f"Metrics callback failed: {e}")
+
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, 'counter')
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            for name, series in pulled.items():
+                gauges.setdefault(name, {}).update(series)
+            for name, series in sorted(gauges.items()):
+                self._header(lines, name, 'gauge')
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, 'histogram')
+                for key, histogram in sorted(series.items()):
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry shared by collectors, the orchestrator and the API
+registry = MetricsRegistry()
+
+registry.describe('swarm_fetch_seconds', 'histogram', 'Latency of one upstream fetch (feed, subreddit, quote batch)')
+registry.describe('swarm_fetch_errors_total', 'counter', 'Upstream fetches that failed or returned an unusable status')
+registry.describe('swarm_bytes_fetched_total', 'counter', 'Response bytes received from upstreams')
+registry.describe('swarm_items_fetched_total', 'counter', 'Articles, posts or quotes returned by upstreams')
+registry.describe('swarm_collector_seconds', 'histogram', 'Time for a collector to finish all of its sources')
+registry.describe('swarm_stage_seconds', 'histogram', 'Time spent in each refresh stage')
+registry.describe('swarm_refresh_seconds', 'histogram', 'End-to-end gather_intelligence latency')
+registry.describe('swarm_refresh_total', 'counter', 'Refreshes by outcome')
+registry.describe('swarm_source_age_seconds', 'gauge', 'Seconds since each source was last fetched')
+registry.describe('swarm_source_stale', 'gauge', '1 while a source serves previous items for targets that failed or were late')
+registry.describe('swarm_source_deadline_misses_total', 'counter', 'Source targets cancelled at their deadline')
+registry.describe('swarm_source_failures_total', 'counter', 'Source targets whose fetch raised')
+registry.describe('swarm_comment_threads_truncated_total', 'counter', 'Comment threads cut short by the comment or byte limit')
+registry.describe('swarm_snapshot_age_seconds', 'gauge', 'Age of the snapshot currently served')
+registry.describe('swarm_documents', 'gauge', 'Documents in the current window per source')
+registry.describe('swarm_feed_documents', 'gauge', 'Documents in the current window per feed or subreddit')
+registry.describe('swarm_stream_subscribers', 'gauge', 'Clients connected to the intelligence delta stream')
+registry.describe('swarm_stream_events_total', 'counter', 'Intelligence deltas published')
+registry.describe('swarm_stream_bytes_total', 'counter', 'Delta bytes queued for stream clients')
+registry.describe('swarm_stream_dropped_total', 'counter', 'Stream clients disconnected for falling behind')
+registry.describe('swarm_bytes_saved_total', 'counter', 'Response bytes not downloaded thanks to 304 Not Modified')
+registry.describe('swarm_rss_feed_events_total', 'counter', 'Conditional-fetch outcomes per RSS feed (RSSCollector.feed_metrics)')
+registry.describe('swarm_rss_parse_seconds_total', 'counter', 'Feed parsing time spent and saved per RSS feed')
+registry.describe('swarm_cache_hits_total', 'counter', 'Cache hits since start')
+registry.describe('swarm_cache_misses_total', 'counter', 'Cache misses since start')
+registry.describe('swarm_cache_evictions_total', 'counter', 'LRU evictions since start')
+registry.describe('swarm_cache_entries', 'gauge', 'Entries currently held')
+registry.describe('swarm_cache_hit_ratio', 'gauge', 'hits / (hits + misses)')
@@ -0,0 +1,78 @@
+"""
+Parallel Scoring - Shards large document sets across a process pool for backfills
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+from document_processor import DocumentProcessor
+import config
+
+# Engine rebuilt once per worker process from the parent's copy
+_worker_engine = None
+
+
+def _init_worker(engine):
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _score_shard(docs: List[Dict], kind: Optional[str], top_n: int) -> DocumentProcessor:
+    """Score one shard in a worker; the partial processor is pickled back to the parent"""
+    return DocumentProcessor(_worker_engine, top_n).consume(docs, kind)
+
+
+class ParallelScorer:
+    """Scores document streams on a process pool and merges the partials.
+
+    Documents are cut into shards of `shard_size`. Each worker returns the
+    counters and top-N of its own shard, and the parent merges them in
+    shard order. Only `workers * 2` shards are in flight at once, so a
+    backfill streamed from the article store never sits fully in memory.
+    """
+
+    def __init__(self, engine, workers: int = None, shard_size: int = 2000, top_n: int = 10):
+        self.engine = engine
+        self.workers = workers or config.SWARM_CONFIG['workers']
+        self.shard_size = shard_size
+        self.top_n = top_n
+        self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.engine,))
+        return self._pool
+
+    def score(self, documents: Iterable[Dict], kind: str = None) -> DocumentProcessor:
+        """Aggregate every document into one DocumentProcessor, as `consume` would"""
+        result = DocumentProcessor(self.engine, self.top_n)
+        if self.workers <= 1:
+            return result.consume(documents, kind)
+
+        pool = self._executor()
+        in_flight = deque()
+        documents = iter(documents)
+        while True:
+            shard = list(islice(documents, self.shard_size))
+            if shard:
+                in_flight.append(pool.submit(_score_shard, shard, kind, self.top_n))
+            if in_flight and (not shard or len(in_flight) >= self.workers * 2):
+                result.merge(in_flight.popleft().result())
+            if not shard and not in_flight:
+                return result
+
+    def backfill(self, store, since_ts: int, until_ts: int = None) -> DocumentProcessor:
+        """Rescore every stored document published in [since_ts, until_ts)"""
+        return self.score(store.iter_window(since_ts, until_ts))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> 'ParallelScorer':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
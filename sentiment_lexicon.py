@@ -0,0 +1,77 @@
+"""
+Sentiment Lexicon - Keyword sentiment compiled into a single-pass matcher
+"""
+import string
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+DEFAULT_POSITIVE_WORDS = [
+    'bull', 'bulls', 'bullish', 'up', 'rise', 'rises', 'rising', 'rose',
+    'gain', 'gains', 'gained', 'profit', 'profits', 'buy', 'buying',
+    'moon', 'rocket', 'surge', 'surges', 'surged'
+]
+
+DEFAULT_NEGATIVE_WORDS = [
+    'bear', 'bears', 'bearish', 'down', 'fall', 'falls', 'falling', 'fell',
+    'loss', 'losses', 'crash', 'crashes', 'crashed', 'sell', 'selling', 'selloff',
+    'dump', 'dumping', 'plunge', 'plunges', 'plunged', 'drop', 'drops', 'dropped'
+]
+
+# Everything that is not part of a word becomes a space, so split() yields
+# whole words and a lexicon hit is always a word-boundary match. Tokens are
+# bytes because bytes.translate/split are markedly cheaper than their str
+# counterparts; the handful of non-ASCII separators is mapped first.
+_ASCII_SEPARATORS = (string.punctuation + string.digits).encode()
+_SEPARATORS = bytes.maketrans(_ASCII_SEPARATORS, b' ' * len(_ASCII_SEPARATORS))
+_UNICODE_SEPARATORS = str.maketrans({c: ' ' for c in '\u2018\u2019\u201c\u201d\u2013\u2014\u2026\u00a0'})
+
+
+class SentimentLexicon:
+    """Positive/negative keyword lexicon compiled once into word lookup sets.
+
+    Text is tokenized in a single pass and every whole-word hit is counted,
+    so "supply" no longer matches "up" and "dropbox" no longer matches "drop".
+    """
+
+    def __init__(self, positive_words: Iterable[str] = None, negative_words: Iterable[str] = None):
+        self.positive_words = sorted({w.lower() for w in (positive_words or DEFAULT_POSITIVE_WORDS)})
+        self.negative_words = sorted({w.lower() for w in (negative_words or DEFAULT_NEGATIVE_WORDS)})
+        self._positive = frozenset(w.encode() for w in self.positive_words)
+        self._negative = frozenset(w.encode() for w in self.negative_words)
+
+    @staticmethod
+    def tokenize(text: str) -> List[bytes]:
+        """Lowercase and split text into words"""
+        text = text.lower()
+        if not text.isascii():
+            text = text.translate(_UNICODE_SEPARATORS)
+        return text.encode().translate(_SEPARATORS).split()
+
+    def count(self, text: str) -> Tuple[int, int]:
+        """Return (positive, negative) hit counts for one document"""
+        tokens = self.tokenize(text)
+        # map() over the frozenset membership test keeps the scan in C
+        return sum(map(self._positive.__contains__, tokens)), sum(map(self._negative.__contains__, tokens))
+
+    def analyze(self, text: str) -> Dict[str, int]:
+        """Score one document in the engine's dict format"""
+        positive, negative = self.count(text)
+        return {
+            'positive': positive,
+            'negative': negative,
+            'neutral': 1 if positive == 0 and negative == 0 else 0
+        }
+
+    def score_batch(self, texts: Iterable[str]) -> np.ndarray:
+        """Score many documents; returns an (n, 2) int32 array of positive/negative counts"""
+        counts = np.array([self.count(text) for text in texts], dtype=np.int32)
+        return counts.reshape(-1, 2)
+
+    @staticmethod
+    def totals(counts: np.ndarray) -> Dict[str, int]:
+        """Collapse score_batch output into positive/negative/neutral totals"""
+        return {
+            'positive': int(counts[:, 0].sum()),
+            'negative': int(counts[:, 1].sum()),
+            'neutral': int((counts.sum(axis=1) == 0).sum())
+        }
@@ -0,0 +1,104 @@
+"""
+Sentiment Series - Rolling global and per-ticker sentiment in fixed time buckets
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import numpy as np
+import config
+
+FIELDS = ('positive', 'negative', 'neutral')
+
+
+class RingSeries:
+    """Preallocated ring buffer of (positive, negative, neutral) counts per time bucket.
+
+    Slot `bucket % capacity` holds the bucket with that number; a slot is
+    reset the first time a newer bucket lands on it, so appends are O(1)
+    and the buffer always covers the last `capacity` buckets.
+    """
+
+    def __init__(self, bucket_seconds: int, capacity: int):
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.counts = np.zeros((capacity, len(FIELDS)), dtype=np.int32)
+        self.buckets = np.full(capacity, -1, dtype=np.int64)
+        self.latest = -1
+
+    def add(self, ts: float, counts: Tuple[int, int, int]):
+        bucket = int(ts) // self.bucket_seconds
+        if bucket <= self.latest - self.capacity:
+            return  # older than the buffer reaches
+        slot = bucket % self.capacity
+        if self.buckets[slot] != bucket:
+            self.buckets[slot] = bucket
+            self.counts[slot] = 0
+        self.counts[slot] += counts
+        if bucket > self.latest:
+            self.latest = bucket
+
+    def window(self, since_ts: float, until_ts: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(bucket start times, counts) for every bucket in [since_ts, until_ts), empty buckets as zeros"""
+        first = int(since_ts) // self.bucket_seconds
+        last = -(-int(until_ts) // self.bucket_seconds) - 1
+        first = max(first, last - self.capacity + 1)
+        wanted = np.arange(first, last + 1, dtype=np.int64)
+        slots = wanted % self.capacity
+        counts = np.where((self.buckets[slots] == wanted)[:, None], self.counts[slots], 0)
+        return wanted * self.bucket_seconds, counts
+
+
+class SentimentSeries:
+    """Global and per-ticker RingSeries at every configured resolution.
+
+    Per-ticker buffers are created on first mention, and mentions are
+    already limited to the ticker universe, so memory is bounded.
+    """
+
+    def __init__(self, resolutions: Dict[str, Tuple[int, int]] = None):
+        # name -> (bucket seconds, number of buckets kept)
+        self.resolutions = resolutions or config.SERIES_CONFIG['resolutions']
+        self.market = self._new_series()
+        self.tickers: Dict[str, Dict[str, RingSeries]] = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self) -> Dict[str, RingSeries]:
+        return {name: RingSeries(seconds, capacity) for name, (seconds, capacity) in self.resolutions.items()}
+
+    def record(self, ts: float, score, sign: int = 1):
+        """Add one scored document (a DocumentScore) at time `ts`; sign=-1 takes it back"""
+        sentiment = tuple(sign * value for value in score.sentiment)
+        text_sentiment = tuple(sign * value for value in score.text_sentiment)
+        with self._lock:
+            for series in self.market.values():
+                series.add(ts, sentiment)
+            for symbol in score.tickers:
+                per_resolution = self.tickers.get(symbol)
+                if per_resolution is None:
+                    per_resolution = self.tickers[symbol] = self._new_series()
+                for series in per_resolution.values():
+                    series.add(ts, text_sentiment)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.tickers
+
+    def window(self, symbol: Optional[str] = None, resolution: str = '5m',
+               since_ts: float = None, until_ts: float = None) -> Dict:
+        """Bucketed counts for one ticker (or the whole market when symbol is None)"""
+        if resolution not in self.resolutions:
+            raise ValueError(f"Unknown resolution {resolution!r}; expected one of {', '.join(self.resolutions)}")
+        until_ts = time.time() if until_ts is None else until_ts
+        seconds, capacity = self.resolutions[resolution]
+        since_ts = until_ts - seconds * capacity if since_ts is None else since_ts
+
+        with self._lock:
+            per_resolution = self.market if symbol is None else self.tickers.get(symbol)
+            if per_resolution is None:
+                starts, counts = RingSeries(seconds, capacity).window(since_ts, until_ts)
+            else:
+                starts, counts = per_resolution[resolution].window(since_ts, until_ts)
+
+        series = {'resolution': resolution, 'bucket_seconds': seconds, 'timestamps': starts.tolist()}
+        for column, field in enumerate(FIELDS):
+            series[field] = counts[:, column].tolist()
+        return series
@@ -0,0 +1,78 @@
+"""
+Snapshot - Intelligence snapshots serialized once, with compressed variants and an ETag
+"""
+import gzip
+import hashlib
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+
+def encode_json(value) -> bytes:
+    """Compact JSON with sorted keys, matching what Flask's jsonify produced"""
+    return json.dumps(value, separators=(',', ':'), sort_keys=True, default=str).encode('utf-8')
+
+
+class SerializedSnapshot:
+    """One intelligence dict plus every byte representation the API serves.
+
+    Built once per refresh. Each top-level field is encoded separately, so
+    `?fields=` responses are assembled from the cached pieces without
+    re-encoding anything.
+    """
+
+    def __init__(self, data: Dict):
+        self.data = data
+        self.created_at = time.time()
+        self.fields: Dict[str, bytes] = {key: encode_json(value) for key, value in sorted(data.items())}
+        self.body = self._join(self.fields.items())
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.gzip = gzip.compress(self.body, compresslevel=6, mtime=0)
+        self.br = brotli.compress(self.body, quality=5) if brotli is not None else None
+
+    @staticmethod
+    def _join(items: Iterable[Tuple[str, bytes]]) -> bytes:
+        return b'{' + b','.join(encode_json(key) + b':' + value for key, value in items) + b'}'
+
+    def encoded(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """Best variant of the full body for an Accept-Encoding header"""
+        accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+        if self.br is not None and 'br' in accepted:
+            return self.br, 'br'
+        if 'gzip' in accepted:
+            return self.gzip, 'gzip'
+        return self.body, None
+
+    def select(self, fields: List[str]) -> bytes:
+        """Body containing only the requested top-level fields (unknown names are skipped)"""
+        return self._join((key, self.fields[key]) for key in sorted(set(fields)) if key in self.fields)
+
+    def page(self, field: str, offset: int, limit: int) -> Dict:
+        """A slice of one list or map field, e.g. per_ticker_sentiment 100 tickers at a time"""
+        if field not in self.data:
+            raise KeyError(field)
+        value = self.data[field]
+        if isinstance(value, dict):
+            keys = sorted(value)
+            items = {key: value[key] for key in keys[offset:offset + limit]}
+            total = len(keys)
+        elif isinstance(value, list):
+            items = value[offset:offset + limit]
+            total = len(value)
+        else:
+            raise ValueError(f"Field {field!r} is not a list or map")
+        return {'field': field, 'offset': offset, 'limit': limit, 'total': total, 'items': items}
+
+    def encoding_etag(self, encoding: Optional[str]) -> str:
+        """Strong ETag of the full body in one content-coding; each coding has its own bytes, so its own tag"""
+        return f'{self.etag[:-1]}-{encoding}"' if encoding else self.etag
+
+    def variant_etag(self, variant: str) -> str:
+        """Strong ETag for a derived response (field selection or a page)"""
+        suffix = hashlib.sha1(variant.encode('utf-8')).hexdigest()[:8]
+        return f'{self.etag[:-1]}-{suffix}"'
@@ -0,0 +1,118 @@
+"""
+Source Scheduler - Refreshes each source on its own interval, concurrency budget and deadline
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+from data_collectors.sources import KINDS, Source
+from metrics import registry
+
+
+class SourceResult(NamedTuple):
+    name: str
+    kind: str
+    items: List[Dict]
+    fetched_at: float  # wall-clock time of the run that produced these items
+    stale: bool  # some targets missed the deadline or failed...
+    missed: List[str]  # ...and these are serving their previous items
+
+
+class SourceScheduler:
+    """Runs the sources that are due and keeps the last good items of every target.
+
+    A target that fails or is still running when its source's deadline
+    passes is cancelled and its previous items are served instead, so one
+    slow upstream neither stalls the refresh nor retracts its documents.
+    """
+
+    def __init__(self, sources: List[Source]):
+        self.sources: Dict[str, Source] = {source.name: source for source in sources}
+        self.results: Dict[str, SourceResult] = {}
+        self._target_items: Dict[str, Dict[str, List[Dict]]] = {name: {} for name in self.sources}
+        self._last_run: Dict[str, float] = {}  # monotonic start of the latest run
+
+    def tick_interval(self) -> float:
+        """How often something becomes due: the shortest source interval"""
+        return min(source.interval for source in self.sources.values())
+
+    def due(self, now: float = None) -> List[str]:
+        now = time.monotonic() if now is None else now
+        return [name for name, source in self.sources.items()
+                if name not in self._last_run or now - self._last_run[name] >= source.interval]
+
+    async def run(self, session, force: bool = False) -> List[str]:
+        """Fetch every due source (every source with `force`) and return the names that ran"""
+        names = list(self.sources) if force else self.due()
+        # Sources reading other sources' items (e.g. comments of the latest
+        # posts) start once those have been fetched
+        first = [name for name in names if not self.sources[name].after]
+        await asyncio.gather(*(self._run_source(self.sources[name], session) for name in first))
+        await asyncio.gather(*(self._run_source(self.sources[name], session) for name in names if name not in first))
+        return names
+
+    async def _run_source(self, source: Source, session):
+        self._last_run[source.name] = time.monotonic()
+        limit = asyncio.Semaphore(source.concurrency)
+
+        async def fetch(target: str) -> List[Dict]:
+            async with limit:
+                return await source.fetch(session, target)
+
+        with registry.timer('swarm_collector_seconds', collector=source.name):
+            tasks = {asyncio.ensure_future(fetch(target)): target for target in source.targets()}
+            done = set()
+            if tasks:
+                done, pending = await asyncio.wait(tasks, timeout=source.deadline)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        previous = self._target_items[source.name]
+        items_by_target = {}
+        missed = []
+        for task, target in tasks.items():
+            if task in done and not task.cancelled() and task.exception() is None:
+                items_by_target[target] = task.result()
+                continue
+            missed.append(target)
+            items_by_target[target] = previous.get(target, [])
+            if task not in done:
+                registry.inc('swarm_source_deadline_misses_total', source=source.name)
+                print(f"[{datetime.now()}] {source.name}: {target} missed the {source.deadline}s deadline, "
+                      f"serving {len(items_by_target[target])} previous items")
+            else:
+                registry.inc('swarm_source_failures_total', source=source.name)
+
+        self._target_items[source.name] = items_by_target
+        items = source.sort_items([item for target_items in items_by_target.values() for item in target_items])
+        self.results[source.name] = SourceResult(source.name, source.kind, items, time.time(), bool(missed), missed)
+
+    def items_by_kind(self) -> Dict[str, List[Dict]]:
+        """Latest items of every source, concatenated per kind"""
+        combined = {kind: [] for kind in KINDS}
+        for result in self.results.values():
+            combined[result.kind].extend(result.items)
+        return combined
+
+    def status(self) -> Dict[str, Dict]:
+        """Per-source freshness, published with every intelligence snapshot"""
+        status = {}
+        for name, source in self.sources.items():
+            result: Optional[SourceResult] = self.results.get(name)
+            status[name] = {
+                'kind': source.kind,
+                'interval': source.interval,
+                'deadline': source.deadline,
+                'items': len(result.items) if result else 0,
+                'updated_at': datetime.fromtimestamp(result.fetched_at).isoformat() if result else None,
+                'stale': result.stale if result else True,
+                'missed': list(result.missed) if result else []
+            }
+        return status
+
+    def metric_samples(self):
+        now = time.time()
+        for name, result in self.results.items():
+            yield 'swarm_source_age_seconds', {'source': name}, now - result.fetched_at
+            yield 'swarm_source_stale', {'source': name}, int(result.stale)
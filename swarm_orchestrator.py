@@ -2,83 +2,267 @@
 Swarm Orchestrator - Coordinates multiple data collectors
 """
 import asyncio
-import aiohttp
-from typing import Dict, List
+import threading
+import time
+from importlib import import_module
+from typing import Dict, List, Optional
 from datetime import datetime
-from data_collectors.rss_collector import RSSCollector
-from data_collectors.financial_collector import FinancialCollector
-from data_collectors.reddit_collector import RedditCollector
+from data_collectors.sources import create_sources
+from delta_stream import DeltaBroadcaster
 from intelligence_engine import IntelligenceEngine
+from incremental_aggregator import IncrementalAggregator, SyncStats
+from parallel_scoring import ParallelScorer
+from sentiment_series import SentimentSeries
+from cache import create_cache
+from article_store import ArticleStore, dedupe
+from metrics import registry
+from snapshot import SerializedSnapshot
+from source_scheduler import SourceScheduler
 import config
 
+# Collectors pull in aiohttp, feedparser, pandas and yfinance, so each one is
+# imported and built the first time it is used instead of at startup
+LAZY_COLLECTORS = {
+    'rss_collector': ('data_collectors.rss_collector', 'RSSCollector'),
+    'financial_collector': ('data_collectors.financial_collector', 'FinancialCollector'),
+    'reddit_collector': ('data_collectors.reddit_collector', 'RedditCollector'),
+}
+
 class SwarmOrchestrator:
     def __init__(self):
-        self.rss_collector = RSSCollector()
-        self.financial_collector = FinancialCollector()
-        self.reddit_collector = RedditCollector()
         self.intelligence_engine = IntelligenceEngine()
-        self.cache = {}
+        self.article_store = None
+        if config.STORAGE_CONFIG['enabled']:
+            self.article_store = ArticleStore(config.STORAGE_CONFIG['article_db'])
+        self.sentiment_series = SentimentSeries()
+        # Each source refreshes on its own interval with its own deadline
+        self.scheduler = SourceScheduler(create_sources(self))
+        self.aggregator = IncrementalAggregator(self.intelligence_engine, store=self.article_store,
+                                                series=self.sentiment_series)
+        # Snapshots persist on disk (when enabled) so a restart can serve the last one
+        self.cache = create_cache('orchestrator', max_size=16, default_ttl=config.SWARM_CONFIG['cache_duration'])
         self.last_update = None
+        # Bytes, compressed variants and ETag of the snapshot being served
+        self._serialized: Optional[SerializedSnapshot] = None
+        # Pushes what changed after each refresh to /api/intelligence/stream clients
+        self.deltas = DeltaBroadcaster()
+        # Index quotes behind the current snapshot, without their fetch timestamps
+        self._quotes: Optional[List[Dict]] = None
+        entry = self.cache.get_entry('intelligence')
+        if entry is not None:
+            self.last_update = datetime.fromtimestamp(entry.stored_at)
+        # Single-flight guard: at most one gather runs at a time
+        self._refresh_lock = threading.Lock()
+        self._refresher = None
+        self._stop_refresher = threading.Event()
+        registry.register_callback('orchestrator', self.metric_samples)
     
-    async def collect_news_async(self, feed_urls: List[str]) -> List[Dict]:
-        """Asynchronously collect news from RSS feeds"""
-        loop = asyncio.get_event_loop()
-        # Run in executor to avoid blocking
-        return await loop.run_in_executor(None, self.rss_collector.collect_all, feed_urls)
+    def __getattr__(self, name: str):
+        """Build a collector on first access (assigning one beforehand replaces it)"""
+        if name not in LAZY_COLLECTORS:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        module, cls = LAZY_COLLECTORS[name]
+        collector = getattr(import_module(module), cls)()
+        setattr(self, name, collector)
+        return collector
     
-    async def collect_reddit_async(self, subreddits: List[str]) -> List[Dict]:
-        """Asynchronously collect Reddit data"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.reddit_collector.collect_all, subreddits)
+    def metric_samples(self):
+        """Snapshot age, window sizes and RSS feed counters, pulled at scrape time"""
+        age = self.snapshot_age()
+        if age is not None:
+            yield 'swarm_snapshot_age_seconds', {}, age
+        for kind, documents in self.aggregator.documents.items():
+            yield 'swarm_documents', {'source': kind}, len(documents)
+            for feed, count in documents.source_counts().items():
+                yield 'swarm_feed_documents', {'source': kind, 'feed': feed}, count
+        yield from self.scheduler.metric_samples()
+        if 'rss_collector' in self.__dict__:
+            yield from self.rss_collector.metric_samples()
     
-    async def collect_financial_async(self) -> List[Dict]:
-        """Asynchronously collect financial data"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.financial_collector.get_market_indices)
+    async def gather_intelligence(self, force: bool = False) -> Dict:
+        """Gather intelligence from every source that is due (all of them with `force`)"""
+        start = time.perf_counter()
+        try:
+            intelligence = await self._gather_intelligence(force)
+        except Exception:
+            registry.inc('swarm_refresh_total', status='error')
+            raise
+        registry.observe('swarm_refresh_seconds', time.perf_counter() - start)
+        registry.inc('swarm_refresh_total', status='ok')
+        return intelligence
     
-    async def gather_intelligence(self) -> Dict:
-        """Gather intelligence from all sources in parallel"""
+    async def _gather_intelligence(self, force: bool = False) -> Dict:
+        from data_collectors.session import create_session
         print(f"[{datetime.now()}] Starting intelligence gathering...")
         
-        # Collect from all sources in parallel
-        news_task = self.collect_news_async(config.NEWS_SOURCES['rss_feeds'])
-        reddit_task = self.collect_reddit_async(config.NEWS_SOURCES['reddit']['subreddits'])
-        financial_task = self.collect_financial_async()
+        # Collect the due sources in parallel over one pooled session; sources
+        # that are not due, or miss their deadline, contribute their last items
+        with registry.timer('swarm_stage_seconds', stage='collect'):
+            async with create_session() as session:
+                ran = await self.scheduler.run(session, force=force)
+        refreshed = {self.scheduler.sources[name].kind for name in ran}
+        items = self.scheduler.items_by_kind()
+        news, reddit, comments, financial = items['rss'], items['reddit'], items['comments'], items['financial']
+        stale = [name for name, result in self.scheduler.results.items() if result.stale]
+        
+        print(f"[{datetime.now()}] Collected {len(news)} news articles, {len(reddit)} Reddit posts, {len(comments)} comments, "
+              f"{len(financial)} market indices (refreshed: {', '.join(ran) or 'none'}; stale: {', '.join(stale) or 'none'})")
+        
+        # Syndicated stories and cross-posts are counted once
+        with registry.timer('swarm_stage_seconds', stage='dedupe'):
+            news, reddit = dedupe(news), dedupe(reddit)
+        
+        # Aggregate intelligence, scoring only documents that are new or changed
+        news_stats = reddit_stats = comment_stats = SyncStats(0, 0, 0, 0)
+        tops = (self.aggregator.top_news(), self.aggregator.top_reddit())
+        with registry.timer('swarm_stage_seconds', stage='score'):
+            if 'rss' in refreshed:
+                news_stats = self.aggregator.sync('rss', news)
+            if 'reddit' in refreshed:
+                reddit_stats = self.aggregator.sync('reddit', reddit)
+            if 'comments' in refreshed:
+                comment_stats = self.aggregator.sync('comments', comments)
+        print(f"[{datetime.now()}] Scored {news_stats.added + news_stats.changed} news / "
+              f"{reddit_stats.added + reddit_stats.changed} Reddit items / "
+              f"{comment_stats.added + comment_stats.changed} comments, "
+              f"retracted {news_stats.retracted + reddit_stats.retracted + comment_stats.retracted}")
+        
+        # A quiet tick (e.g. only index quotes were due and they did not move)
+        # keeps the current snapshot instead of rebuilding and re-encoding it
+        quotes = [{key: value for key, value in quote.items() if key != 'timestamp'} for quote in financial]
+        windows_changed = (any(stats.added or stats.changed or stats.retracted
+                               for stats in (news_stats, reddit_stats, comment_stats))
+                           or tops != (self.aggregator.top_news(), self.aggregator.top_reddit()))
+        if not windows_changed and quotes == self._quotes and self._serialized is not None:
+            print(f"[{datetime.now()}] Nothing changed; keeping the current snapshot")
+            self.last_update = datetime.now()
+            return self._serialized.data
+        self._quotes = quotes
         
-        news, reddit, financial = await asyncio.gather(
-            news_task,
-            reddit_task,
-            financial_task
-        )
+        with registry.timer('swarm_stage_seconds', stage='build'):
+            intelligence = self.intelligence_engine.build_intelligence(self.aggregator, financial)
+            intelligence['sources'] = self.scheduler.status()
         
-        print(f"[{datetime.now()}] Collected {len(news)} news articles, {len(reddit)} Reddit posts, {len(financial)} market indices")
+        if self.article_store is not None:
+            retention = config.STORAGE_CONFIG['retention_days'] * 86400
+            with registry.timer('swarm_stage_seconds', stage='prune'):
+                self.article_store.prune(int(datetime.now().timestamp()) - retention)
         
-        # Aggregate intelligence
-        intelligence = self.intelligence_engine.aggregate_intelligence(news, reddit, financial)
+        # Serialize once here instead of on every API request
+        with registry.timer('swarm_stage_seconds', stage='serialize'):
+            serialized = SerializedSnapshot(intelligence)
         
         # Cache the results
-        self.cache = intelligence
+        with registry.timer('swarm_stage_seconds', stage='cache'):
+            self.cache.set('intelligence', intelligence)
+        self._serialized = serialized
         self.last_update = datetime.now()
+        self.deltas.publish(serialized)
         
         return intelligence
     
-    def get_cached_intelligence(self) -> Dict:
-        """Get cached intelligence if available and fresh"""
-        if self.cache and self.last_update:
-            age = (datetime.now() - self.last_update).total_seconds()
-            if age < config.SWARM_CONFIG['cache_duration']:
-                return self.cache
-        
-        return None
+    def backfill_intelligence(self, since_ts: int, until_ts: int = None) -> Dict:
+        """Intelligence over a stored time window, scored on SWARM_CONFIG['workers'] processes
+        
+        The live aggregate and snapshot cache are left untouched.
+        """
+        if self.article_store is None:
+            raise RuntimeError("Backfill needs the article store (SWARM_STORAGE_ENABLED=1)")
+        with ParallelScorer(self.intelligence_engine) as scorer:
+            processor = scorer.backfill(self.article_store, since_ts, until_ts)
+        return self.intelligence_engine.build_intelligence(processor, [])
+        
+    def latest_snapshot(self) -> Optional[Dict]:
+        """Most recent snapshot regardless of age, without counting as a cache lookup"""
+        entry = self.cache.get_entry('intelligence')
+        if entry is None or entry.negative:
+            return None
+        return entry.value
+    
+    def snapshot_age(self) -> Optional[float]:
+        """Seconds since the current snapshot was produced (None before the first one)"""
+        if not self.last_update:
+            return None
+        return (datetime.now() - self.last_update).total_seconds()
+    
+    def refresh(self, force: bool = False) -> Dict:
+        """Run one gather, or wait for the one already in flight and share its result"""
+        started_from = self.last_update
+        with self._refresh_lock:
+            snapshot = self.latest_snapshot()
+            if snapshot and self.last_update != started_from:
+                return snapshot
+            return asyncio.run(self.gather_intelligence(force=force))
+    
+    def is_refreshing(self) -> bool:
+        """True while a gather is in flight"""
+        return self._refresh_lock.locked()
+    
+    def is_warming_up(self) -> bool:
+        """No snapshot yet, but the background refresher is about to produce one"""
+        if self.latest_snapshot() is not None:
+            return False
+        return self.is_refreshing() or (self._refresher is not None and self._refresher.is_alive())
+    
+    def refresh_in_background(self) -> bool:
+        """Start a refresh on a worker thread unless one is already running"""
+        if self.is_refreshing():
+            return False
+        threading.Thread(target=self._safe_refresh, name='swarm-refresh', daemon=True).start()
+        return True
+    
+    def _safe_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            # Keep serving the last good snapshot
+            print(f"[{datetime.now()}] Background refresh failed: {e}")
+    
+    def start_background_refresh(self, interval: int = None):
+        """Refresh every `interval` seconds on a daemon thread
+        
+        Defaults to the shortest source interval; each tick only fetches the
+        sources that are due (config.SOURCES_CONFIG).
+        """
+        if self._refresher and self._refresher.is_alive():
+            return
+        interval = interval or self.scheduler.tick_interval()
+        self._stop_refresher.clear()
+        
+        def _loop():
+            if self.latest_snapshot() is None or self.snapshot_age() >= interval:
+                self._safe_refresh()
+            while not self._stop_refresher.wait(interval):
+                self._safe_refresh()
+        
+        self._refresher = threading.Thread(target=_loop, name='swarm-refresher', daemon=True)
+        self._refresher.start()
+    
+    def stop_background_refresh(self):
+        self._stop_refresher.set()
     
     def get_intelligence(self, force_refresh: bool = False) -> Dict:
-        """Get intelligence (from cache or fresh)"""
-        if not force_refresh:
-            cached = self.get_cached_intelligence()
-            if cached:
-                return cached
-        
-        # Run async gather
-        return asyncio.run(self.gather_intelligence())
+        """Get intelligence (stale-while-revalidate)
+        
+        Any existing snapshot is returned immediately; if it is older than
+        the update interval a single background refresh is kicked off.
+        Only the very first call, or a forced refresh, waits for a gather.
+        """
+        snapshot = None if force_refresh else self.cache.get('intelligence', allow_stale=True)
+        if snapshot is None:
+            return self.refresh(force=force_refresh)
+        
+        if self.snapshot_age() >= config.SWARM_CONFIG['update_interval']:
+            self.refresh_in_background()
+        return snapshot
+
+    def get_serialized(self, force_refresh: bool = False) -> SerializedSnapshot:
+        """Like get_intelligence, but returns the pre-encoded snapshot"""
+        intelligence = self.get_intelligence(force_refresh=force_refresh)
+        serialized = self._serialized
+        if serialized is None or serialized.data is not intelligence:
+            # e.g. the first request after a restart, served from the persisted snapshot
+            serialized = self._serialized = SerializedSnapshot(intelligence)
+        return serialized
 
 
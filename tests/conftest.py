@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# Before config is imported: keep caches and the article database out of the working tree
+os.environ['SWARM_CACHE_PERSIST'] = '0'
+os.environ['SWARM_ARTICLE_DB'] = os.path.join(tempfile.mkdtemp(prefix='swarm-tests-'), 'articles.sqlite3')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from intelligence_engine import IntelligenceEngine
+
+
+@pytest.fixture(scope='session')
+def engine() -> IntelligenceEngine:
+    return IntelligenceEngine()
@@ -0,0 +1,28 @@
+import pytest
+from app import app, swarm
+from snapshot import SerializedSnapshot
+
+
+@pytest.fixture
+def client(monkeypatch):
+    snapshot = SerializedSnapshot({'summary': 'Markets calm ' * 50, 'top_news': [], 'trending_stocks': {'NVDA': 3}})
+    monkeypatch.setattr(swarm, 'is_warming_up', lambda: False)
+    monkeypatch.setattr(swarm, 'get_serialized', lambda force_refresh=False: snapshot)
+    return app.test_client()
+
+
+def test_each_content_coding_has_its_own_etag(client):
+    identity = client.get('/api/intelligence', headers={'Accept-Encoding': 'identity'})
+    gzipped = client.get('/api/intelligence', headers={'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert identity.headers['ETag'] != gzipped.headers['ETag']
+    assert not identity.headers['ETag'].startswith('W/') and not gzipped.headers['ETag'].startswith('W/')
+
+
+def test_any_coding_tag_of_the_current_body_revalidates(client):
+    gzip_tag = client.get('/api/intelligence', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    for accept in ('gzip', 'identity'):
+        response = client.get('/api/intelligence', headers={'Accept-Encoding': accept, 'If-None-Match': gzip_tag})
+        assert response.status_code == 304
+    stale = client.get('/api/intelligence', headers={'If-None-Match': '"0123456789abcdef-gzip"'})
+    assert stale.status_code == 200
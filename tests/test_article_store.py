@@ -0,0 +1,64 @@
+import sqlite3
+import pytest
+from article_store import ArticleStore
+from incremental_aggregator import IncrementalAggregator
+
+URL = 'https://example.com/markets/nvda-beats-estimates'
+TITLE = 'NVDA beats estimates as data center sales surge'
+
+
+@pytest.fixture
+def store(tmp_path) -> ArticleStore:
+    return ArticleStore(str(tmp_path / 'articles.sqlite3'))
+
+
+def news_article() -> dict:
+    return {'title': TITLE, 'summary': 'Strong growth and record profit', 'link': URL, 'source': 'Wire',
+            'published_ts': 1700000000, 'source_type': 'rss'}
+
+
+def reddit_link_post() -> dict:
+    # A link post: same URL and headline as the article, no selftext
+    return {'title': TITLE, 'selftext': '', 'score': 50, 'subreddit': 'stocks', 'url': URL,
+            'permalink': 'https://reddit.com/r/stocks/comments/abc/nvda_beats/', 'created_utc': 1700000100,
+            'source_type': 'reddit'}
+
+
+def test_reddit_post_does_not_reuse_a_news_score(engine, store):
+    aggregator = IncrementalAggregator(engine, store=store)
+    aggregator.sync('rss', [news_article()])
+    news_sentiment = dict(aggregator.news_sentiment)
+
+    aggregator.sync('reddit', [reddit_link_post()])
+
+    assert aggregator.news_sentiment == news_sentiment
+    assert aggregator.reddit_sentiment['positive'] > 0
+    assert aggregator.documents['reddit'].score(0).kind == 'reddit'
+    assert store.contains('rss', news_article()) and store.contains('reddit', reddit_link_post())
+    assert store.count() == 2
+
+
+def test_stored_score_is_reused_within_a_kind(engine, store):
+    IncrementalAggregator(engine, store=store).sync('reddit', [reddit_link_post()])
+    restarted = IncrementalAggregator(engine, store=store)
+    restarted.score_batch = lambda docs, kind=None: pytest.fail('stored score was not reused')
+    restarted.sync('reddit', [reddit_link_post()])
+    assert restarted.reddit_sentiment['positive'] > 0
+
+
+def test_store_with_global_url_key_is_migrated(tmp_path):
+    path = str(tmp_path / 'old.sqlite3')
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE articles (id INTEGER PRIMARY KEY, url_hash TEXT UNIQUE, title_hash TEXT,
+            source_type TEXT NOT NULL, published_ts INTEGER NOT NULL, ingested_ts INTEGER NOT NULL,
+            score_version TEXT, score TEXT, payload TEXT NOT NULL);
+        CREATE INDEX idx_articles_title_hash ON articles (title_hash);
+    ''')
+    conn.close()
+    store = ArticleStore(path)
+    assert store.ingest('rss', [(news_article(), None)]) == 1
+    store = ArticleStore(path)
+    assert store.ingest('reddit', [(reddit_link_post(), None)]) == 1
+    assert store.ingest('reddit', [(reddit_link_post(), None)]) == 0
+    assert store.count() == 2
@@ -0,0 +1,141 @@
+import asyncio
+import glob
+import json
+import os
+import time
+import pytest
+from article_store import ArticleStore
+from data_collectors import reddit_comments
+from data_collectors.reddit_comments import (CommentLimits, CommentThreadTooLarge, comment_document,
+                                             parse_comments, stream_comments)
+from incremental_aggregator import IncrementalAggregator
+from parallel_scoring import ParallelScorer
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                         'benchmarks', 'fixtures', 'reddit_comments', '*', '*.json')))
+LARGEST = max(FIXTURES, key=os.path.getsize)
+
+
+class Body:
+    """Recorded bytes behind the async read()/at_eof() of an aiohttp response body"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+
+    async def read(self, n: int = -1) -> bytes:
+        end = len(self.data) if n < 0 else self.position + n
+        chunk = self.data[self.position:end]
+        self.position += len(chunk)
+        return chunk
+
+    def at_eof(self) -> bool:
+        return self.position >= len(self.data)
+
+
+def post_for(path: str) -> dict:
+    subreddit = os.path.basename(os.path.dirname(path))
+    return {'subreddit': subreddit,
+            'permalink': f"https://reddit.com/r/{subreddit}/comments/{os.path.basename(path)[:-5]}/"}
+
+
+def read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def stream(data: bytes, post: dict, limits: CommentLimits = CommentLimits()) -> dict:
+    return asyncio.run(stream_comments(Body(data), post, limits))
+
+
+@pytest.fixture(params=['ijson', 'json.loads'])
+def reader(request, monkeypatch):
+    if request.param == 'ijson':
+        if reddit_comments.ijson is None:
+            pytest.skip('ijson is not installed')
+    else:
+        monkeypatch.setattr(reddit_comments, 'ijson', None)
+    return request.param
+
+
+@pytest.mark.parametrize('limits', [CommentLimits(), CommentLimits(max_depth=1), CommentLimits(max_comments=25)],
+                         ids=['default', 'depth1', 'first25'])
+def test_streamed_comments_match_the_decoded_thread(reader, limits):
+    for path in FIXTURES:
+        data = read(path)
+        expected = parse_comments(json.loads(data), post_for(path), limits)
+        assert expected
+        assert stream(data, post_for(path), limits)['comments'] == expected, path
+
+
+def test_max_depth(reader):
+    comments = stream(read(LARGEST), post_for(LARGEST), CommentLimits(max_depth=0))['comments']
+    assert comments and {comment['depth'] for comment in comments} == {0}
+    deeper = stream(read(LARGEST), post_for(LARGEST), CommentLimits(max_depth=2))['comments']
+    assert max(comment['depth'] for comment in deeper) == 2
+
+
+def test_max_comments(reader):
+    result = stream(read(LARGEST), post_for(LARGEST), CommentLimits(max_comments=10))
+    assert len(result['comments']) == 10
+    assert result['truncated']
+
+
+def test_max_bytes_keeps_the_comments_read_before_the_cap():
+    if reddit_comments.ijson is None:
+        pytest.skip('ijson is not installed')
+    data = read(LARGEST)
+    result = stream(data, post_for(LARGEST), CommentLimits(max_bytes=len(data) // 4))
+    assert result['truncated'] and result['bytes'] == len(data) // 4
+    assert 0 < len(result['comments']) < len(stream(data, post_for(LARGEST))['comments'])
+
+
+def test_max_bytes_without_ijson_drops_the_thread(monkeypatch):
+    monkeypatch.setattr(reddit_comments, 'ijson', None)
+    data = read(LARGEST)
+    with pytest.raises(CommentThreadTooLarge):
+        stream(data, post_for(LARGEST), CommentLimits(max_bytes=len(data) // 4))
+
+
+def _comment(comment_id: str, body: str, replies=None) -> dict:
+    return {'kind': 't1', 'data': {'id': comment_id, 'body': body, 'score': 1, 'created_utc': 1700000000,
+                                   'permalink': f"/r/stocks/comments/abc/t/{comment_id}/",
+                                   'replies': {'kind': 'Listing', 'data': {'children': replies or []}}}}
+
+
+def test_removed_comments_and_more_stubs_are_skipped(reader):
+    more = {'kind': 'more', 'data': {'id': 'm1', 'count': 40, 'children': ['x1', 'x2']}}
+    thread = [{'kind': 'Listing', 'data': {'children': [{'kind': 't3', 'data': {'id': 'abc', 'title': 'Post'}}]}},
+              {'kind': 'Listing', 'data': {'children': [
+                  _comment('c1', 'AAPL looks strong', [_comment('c2', '[deleted]'), more]),
+                  _comment('c3', '[removed]'),
+                  more]}}]
+    post = {'subreddit': 'stocks', 'permalink': 'https://reddit.com/r/stocks/comments/abc/t/'}
+    comments = stream(json.dumps(thread).encode('utf-8'), post)['comments']
+    assert [comment['selftext'] for comment in comments] == ['AAPL looks strong']
+    assert comments == parse_comments(thread, post)
+
+
+def test_comments_stay_out_of_top_reddit_live_and_in_backfills(engine, tmp_path):
+    now = int(time.time())
+    post = {'title': 'NVDA earnings thread', 'selftext': 'Bullish on NVDA growth', 'score': 5,
+            'created_utc': now, 'subreddit': 'stocks', 'source_type': 'reddit',
+            'permalink': 'https://reddit.com/r/stocks/comments/abc/nvda/'}
+    fields = {'kind': 't1', 'data.body': 'AAPL strong buy, great rally', 'data.created_utc': now}
+    comments = [comment_document(dict(fields, **{'data.id': f"c{i}", 'data.score': 1000 + i}), 0, post,
+                                 CommentLimits()) for i in range(12)]
+
+    store = ArticleStore(str(tmp_path / 'articles.sqlite3'))
+    aggregator = IncrementalAggregator(engine, store=store)
+    aggregator.sync('reddit', [post])
+    aggregator.sync('comments', comments)
+    live = engine.build_intelligence(aggregator, [])
+    assert [doc['permalink'] for doc in live['top_reddit']] == [post['permalink']]
+    assert live['trending_stocks']['AAPL'] == len(comments)
+
+    for workers in (1, 2):
+        with ParallelScorer(engine, workers=workers, shard_size=4) as scorer:
+            backfill = engine.build_intelligence(scorer.backfill(store, now - 60), [])
+        assert [doc['permalink'] for doc in backfill['top_reddit']] == [post['permalink']]
+        assert backfill['reddit_sentiment'] == live['reddit_sentiment']
+        assert backfill['trending_stocks'] == live['trending_stocks']
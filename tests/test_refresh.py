@@ -0,0 +1,78 @@
+import asyncio
+import contextlib
+import io
+import pandas as pd
+import pytest
+import config
+from benchmarks.stub_server import StubServer, fixture_downloader
+from data_collectors.financial_collector import FinancialCollector
+from data_collectors.reddit_collector import RedditCollector
+from swarm_orchestrator import SwarmOrchestrator
+
+
+class CountingDownloader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, symbols, period):
+        self.calls += 1
+        dates = pd.to_datetime(['2024-01-02', '2024-01-03'])
+        return pd.DataFrame({(field, symbol): [100.0, 101.0] for field in ('Close', 'Volume') for symbol in symbols},
+                            index=dates)
+
+
+def test_scheduled_index_fetches_bypass_the_quote_cache():
+    downloader = CountingDownloader()
+    collector = FinancialCollector(downloader=downloader)
+    collector.get_market_indices()
+    collector.get_market_indices()
+    assert downloader.calls == 1
+    collector.get_market_indices(refresh=True)
+    assert downloader.calls == 2
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    with StubServer() as server:
+        monkeypatch.setitem(config.NEWS_SOURCES, 'rss_feeds', server.rss_urls())
+        monkeypatch.setitem(config.NEWS_SOURCES, 'rss_rate_limit', 1e6)
+        monkeypatch.setitem(config.NEWS_SOURCES, 'reddit', dict(config.NEWS_SOURCES['reddit'],
+                            subreddits=server.subreddits(), rate_limit=1e6, burst=1e6))
+        monkeypatch.setitem(config.STORAGE_CONFIG, 'enabled', False)
+        yield server
+
+
+def test_quiet_refresh_keeps_the_snapshot(stub):
+    orchestrator = SwarmOrchestrator()
+    orchestrator.reddit_collector = RedditCollector(base_url=f"{stub.base_url}/r")
+    orchestrator.financial_collector = FinancialCollector(
+        downloader=fixture_downloader(f"{stub.base_url}/yfinance/yfinance_indices.json"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        first = asyncio.run(orchestrator.gather_intelligence(force=True))
+        serialized = orchestrator._serialized
+        second = asyncio.run(orchestrator.gather_intelligence(force=True))
+    assert first['top_news'] and first['market_indices']
+    assert second is first
+    assert orchestrator._serialized is serialized
+
+
+def test_market_indices_keep_their_display_names():
+    indices = FinancialCollector(downloader=CountingDownloader()).get_market_indices()
+    assert [quote['name'] for quote in indices] == ['S&P 500', 'Dow Jones Industrial Average', 'NASDAQ Composite',
+                                                    'Russell 2000']
+
+
+def test_internal_snapshot_checks_leave_the_hit_ratio_alone(stub):
+    orchestrator = SwarmOrchestrator()
+    orchestrator.reddit_collector = RedditCollector(base_url=f"{stub.base_url}/r")
+    orchestrator.financial_collector = FinancialCollector(
+        downloader=fixture_downloader(f"{stub.base_url}/yfinance/yfinance_indices.json"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        orchestrator.refresh(force=True)
+    before = orchestrator.cache.stats()
+    for _ in range(5):
+        assert not orchestrator.is_warming_up()
+        assert orchestrator.latest_snapshot() is not None
+    assert orchestrator.cache.stats() == before
+    orchestrator.get_intelligence()
+    assert orchestrator.cache.stats()['hits'] == before['hits'] + 1
@@ -0,0 +1,84 @@
+"""
+Ticker Universe - Resolves stock symbol mentions against a known set of tickers
+"""
+import hashlib
+import re
+from typing import Iterable, List, Optional, Tuple
+import config
+
+# Real tickers that are also everyday words or jargon; only counted as $CASHTAGS
+DEFAULT_STOP_SYMBOLS = [
+    'A', 'AI', 'ALL', 'ARE', 'BE', 'CAN', 'CEO', 'DD', 'EV', 'FOR', 'GO', 'HAS', 'IT',
+    'KEY', 'NOW', 'ON', 'ONE', 'OPEN', 'PATH', 'RUN', 'SO', 'T', 'U', 'USA', 'W', 'X'
+]
+
+# A candidate is a whole token starting with $ or an upper-case letter; the
+# leading character class lets the regex engine skip lowercase text quickly.
+# Documents in a batch are joined with \x00, which matches on its own.
+_CANDIDATE = re.compile(r'[\x00$A-Z](?<![\w.][$A-Z])(?:(?<=\x00)|[\w.]*)')
+
+
+def load_symbols(path: str) -> List[str]:
+    """One symbol per line; blank lines and # comments are ignored"""
+    with open(path, encoding='utf-8') as f:
+        return [line.split('#', 1)[0].strip().upper() for line in f if line.split('#', 1)[0].strip()]
+
+
+class TickerUniverse:
+    """Compact set of known symbols used to filter regex candidates.
+
+    A bare upper-case word is only a mention if it is in the universe and
+    not on the stop-list; a $cashtag is trusted for any symbol in the
+    universe. Anything else ("CEO", "THE", "USA") is dropped, so per-ticker
+    state can never grow beyond the size of the universe.
+    """
+
+    def __init__(self, symbols: Iterable[str], stop_symbols: Iterable[str] = None):
+        self.symbols = frozenset(s.upper() for s in symbols)
+        self.stop_symbols = frozenset(s.upper() for s in (DEFAULT_STOP_SYMBOLS if stop_symbols is None else stop_symbols))
+        self._bare = self.symbols - self.stop_symbols
+        self.pattern = _CANDIDATE
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'TickerUniverse':
+        """Universe from a ticker file (TICKER_CONFIG['universe_file'] by default)"""
+        return cls(load_symbols(path or config.TICKER_CONFIG['universe_file']))
+
+    def signature(self) -> str:
+        """Short fingerprint of the universe, stop-list and pattern"""
+        rules = '|'.join(sorted(self.symbols) + ['/'] + sorted(self.stop_symbols) + [self.pattern.pattern])
+        return hashlib.sha1(rules.encode('utf-8')).hexdigest()[:12]
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.symbols
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def extract(self, text: str) -> List[str]:
+        """Every known-symbol occurrence in `text`, in order"""
+        return list(self.extract_batch([text])[0]) if text else []
+
+    def extract_batch(self, texts: Iterable[str]) -> List[Tuple[str, ...]]:
+        """Resolve mentions for a whole list of documents with a single regex scan"""
+        texts = [text.replace('\x00', ' ') if text else '' for text in texts]
+        if not texts:
+            return []
+        symbols, bare = self.symbols, self._bare
+        results = []
+        current = []
+        for token in self.pattern.findall('\x00'.join(texts)):
+            if token == '\x00':
+                results.append(tuple(current))
+                current = []
+            elif token[0] == '$':
+                # Cashtags may be lower case ($tsla) and bypass the stop-list
+                symbol = token[1:].rstrip('.').upper()
+                if symbol in symbols:
+                    current.append(symbol)
+            else:
+                symbol = token.rstrip('.')
+                if symbol in bare:
+                    current.append(symbol)
+        results.append(tuple(current))
+        return results
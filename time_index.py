@@ -0,0 +1,48 @@
+"""
+Time Index - Rows ordered by publication time, for O(log n) recency and window queries
+"""
+from typing import Optional, Tuple
+import numpy as np
+
+
+class TimeIndex:
+    """Row numbers sorted by timestamp, with optional prefix sums of per-row counts.
+
+    Built once per window. "Newest since T" and [since, until) lookups are
+    two binary searches, and window totals of `values` (e.g. sentiment
+    counts) are a difference of two prefix sums. Among equal timestamps the
+    earlier row counts as newer, matching a stable newest-first sort.
+    """
+
+    def __init__(self, timestamps: np.ndarray, values: Optional[np.ndarray] = None):
+        rows = np.arange(len(timestamps))
+        self.order = np.lexsort((-rows, timestamps))
+        self.times = timestamps[self.order]
+        self.cumulative = None
+        if values is not None:
+            sums = np.cumsum(values[self.order], axis=0, dtype=np.int64)
+            self.cumulative = np.vstack([np.zeros((1,) + values.shape[1:], dtype=np.int64), sums])
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def span(self, since_ts: float = None, until_ts: float = None) -> Tuple[int, int]:
+        """Positions in time order covering [since_ts, until_ts)"""
+        lo = 0 if since_ts is None else int(np.searchsorted(self.times, since_ts, side='left'))
+        hi = len(self.times) if until_ts is None else int(np.searchsorted(self.times, until_ts, side='left'))
+        return lo, max(lo, hi)
+
+    def rows(self, since_ts: float = None, until_ts: float = None, limit: int = None) -> np.ndarray:
+        """Rows published in [since_ts, until_ts), newest first, at most `limit` of them"""
+        lo, hi = self.span(since_ts, until_ts)
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        return self.order[lo:hi][::-1]
+
+    def newest(self, n: int) -> np.ndarray:
+        return self.rows(limit=n)
+
+    def totals(self, since_ts: float = None, until_ts: float = None) -> np.ndarray:
+        """Sum of `values` over rows in [since_ts, until_ts)"""
+        lo, hi = self.span(since_ts, until_ts)
+        return self.cumulative[hi] - self.cumulative[lo]